@@ -2,13 +2,18 @@ import os
 os.environ["KMP_DUPLICATE_LIB_OK"] = "TRUE"
 import streamlit as st
 import numpy as np
-from PIL import Image
 from streamlit.components.v1 import html
 
-from modules import components, models, utils
+from modules import components, models, utils, metrics
+from modules.ingest import DecodedImage
+from modules.scheduler import AnalysisScheduler
+from modules.embedding_store import normalize_filename
+from modules.overlay import render_overlay, render_preview
+from modules.detections import results_to_arrays
 from modules.utils import get_dominant_colors
 from modules.config import PATHS
-from modules.color_util import categorize_color_family
+from modules.color_util import categorize_color_families
+from modules.color_lut import lut_status
 
 excluded_categories = {"Ceramic floor", "Wooden floor"}
 
@@ -160,11 +165,15 @@ def init_session():
         "selected_items": [],
         "landing_done": False,
         "uploaded_file_path": None,
+        "uploaded_image": None,
+        "preview_image": None,
+        "analysis": None,
         "last_uploaded_file": None,
         "detected_results": None,
         "result_image": None,
         "detected_image": None,
         "dominant_colors": [],
+        "room_palette": None,
     }
 
     for key, value in session_defaults.items():
@@ -281,11 +290,7 @@ def render_sidebar_controls():
                 st.session_state.selected_items = [item_mapping.get(item, item) for item in selected_items_display]
 
                 if st.session_state.uploaded_file_path:
-                    hex_colors = get_dominant_colors(
-                        st.session_state.uploaded_file_path
-                    )
-                    color_families = list(set(categorize_color_family(hex_code) for hex_code in hex_colors if hex_code))
-                    st.session_state.dominant_colors = color_families
+                    st.session_state.dominant_colors = room_palette()["color_families"]
 
                 st.switch_page("pages/2_Preferences.py")
             else:
@@ -339,24 +344,73 @@ def process_new_upload(uploaded_file):
     with st.spinner("🌌 Powering Up the Design Matrix..."):
         try:
             file_path = utils.save_uploaded_file(uploaded_file)
+            # Decoded once here; display, palette, detection and embedding all share these pixels
+            st.session_state.uploaded_image = DecodedImage.from_bytes(uploaded_file.getvalue(), path=file_path)
+            st.session_state.preview_image = render_preview(st.session_state.uploaded_image)
             st.session_state.uploaded_file_path = file_path
             st.session_state.last_uploaded_file = uploaded_file
             reset_detection_state()
+            metrics.increment("uploads")
+            # Detection, palette and embedding run concurrently from here; later renders collect the futures
+            st.session_state.analysis = models.load_analysis_scheduler().submit(st.session_state.uploaded_image)
             st.rerun()
         except Exception as e:
             st.error(f"Error processing upload: {str(e)}")
             st.session_state.uploaded_file_path = None
+            st.session_state.uploaded_image = None
+            st.session_state.preview_image = None
+            st.session_state.analysis = None
             st.session_state.last_uploaded_file = None
 
 def reset_detection_state():
+    st.session_state.analysis = None
     st.session_state.detected_objects = set()
     st.session_state.recommended_objects = set()
     st.session_state.detected_image = None
     st.session_state.selected_items = []
     st.session_state.dominant_colors = []
+    st.session_state.room_palette = None
     st.session_state.detected_results = None
     st.session_state.result_image = None
 
+def analysis_result(stage, compute, *args, **kwargs):
+    """
+    Result of a stage started at upload time, or compute it now if it was never scheduled.
+    A failed stage raises once and is then forgotten, so the next rerun computes it again.
+    """
+    analysis = st.session_state.analysis
+    if analysis and stage in analysis:
+        try:
+            return analysis[stage].result()
+        except Exception:
+            del analysis[stage]
+            raise
+    return compute(*args, **kwargs)
+
+def release_full_image():
+    """
+    Drop the full-resolution upload once every scheduled stage has succeeded and the
+    page has rendered what it needs from it. Until then failed stages may still have
+    to be recomputed from the image; afterwards reruns only read the futures.
+    """
+    analysis = st.session_state.analysis
+    if not analysis or set(analysis) != set(AnalysisScheduler.STAGES):
+        return
+    if not all(future.done() and future.exception() is None for future in analysis.values()):
+        return
+    if st.session_state.room_palette is not None and st.session_state.result_image:
+        st.session_state.uploaded_image = None
+
+def room_palette():
+    """Palette and color families of the current upload, extracted once and kept for every rerun."""
+    if st.session_state.room_palette is None:
+        hex_colors = analysis_result("palette", get_dominant_colors, st.session_state.uploaded_image)
+        st.session_state.room_palette = {
+            "hex_colors": hex_colors,
+            "color_families": list(categorize_color_families([hex_code for hex_code in hex_colors if hex_code]).dropna().unique()),
+        }
+    return st.session_state.room_palette
+
 # Enhanced image display columns
 def display_image_columns(yolo_model):
     with st.container():
@@ -368,15 +422,15 @@ def display_image_columns(yolo_model):
         col_img1, col_img2 = st.columns(2)
         with col_img1:
             st.image(
-                Image.open(st.session_state.uploaded_file_path),
+                st.session_state.preview_image,
                 caption="Original Dimension",
                 use_column_width=True,
-                output_format="PNG"
+                output_format="JPEG"
             )
 
             if st.session_state.uploaded_file_path:
                 try:
-                    hex_colors_display = get_dominant_colors(st.session_state.uploaded_file_path)
+                    hex_colors_display = room_palette()["hex_colors"]
                     if hex_colors_display:
                         st.markdown("<h6 style='color: #2d3748;'>Dominant Colors</h6>", unsafe_allow_html=True)
                         num_colors = len(hex_colors_display)
@@ -395,6 +449,7 @@ def display_image_columns(yolo_model):
 
         if st.session_state.detected_results is None:
             process_object_detection(yolo_model)
+        release_full_image()
 
         with col_img2:
             if st.session_state.result_image:
@@ -402,7 +457,7 @@ def display_image_columns(yolo_model):
                     st.session_state.result_image,
                     caption="AI Vision",
                     use_column_width=True,
-                    output_format="PNG"
+                    output_format="JPEG"
                 )
             else:
                 st.caption("Object detection pending or failed.")
@@ -412,14 +467,20 @@ def display_image_columns(yolo_model):
 def process_object_detection(yolo_model):
     with st.spinner("🔮 Decrypting Your Room's Essence..."):
         try:
-            results = utils.detect_objects(
-                st.session_state.uploaded_file_path,
-                yolo_model
+            results = analysis_result(
+                "detections",
+                utils.detect_objects,
+                st.session_state.uploaded_image,
+                yolo_model,
+                service=models.load_inference_service()
+            )
+            # Only the raw box arrays are kept; the Results object holds a full-resolution copy of the image
+            st.session_state.detected_results = {**results_to_arrays(results), "names": results.names}
+            # Rendered once at display size and kept as JPEG bytes, so reruns neither redraw nor re-encode
+            st.session_state.result_image = render_overlay(
+                st.session_state.uploaded_image,
+                **st.session_state.detected_results
             )
-            st.session_state.detected_results = results 
-            img_with_boxes = results.plot() 
-            img_rgb = img_with_boxes[..., ::-1]
-            st.session_state.result_image = Image.fromarray(img_rgb)
 
             detected_objects = set()
             object_display_mapping = { 
@@ -434,11 +495,11 @@ def process_object_detection(yolo_model):
                 "chair-wooden": "Chair"
             }
 
-            if results.boxes:
-                for box in results.boxes:
-                    internal_cls_name = results.names[int(box.cls.numpy()[0])]
-                    display_name = object_display_mapping.get(internal_cls_name, internal_cls_name)
-                    detected_objects.add(display_name)
+            names = st.session_state.detected_results["names"]
+            for cls in st.session_state.detected_results["classes"]:
+                internal_cls_name = names[int(cls)]
+                display_name = object_display_mapping.get(internal_cls_name, internal_cls_name)
+                detected_objects.add(display_name)
 
             st.session_state.detected_objects = detected_objects if detected_objects else set()
 
@@ -448,7 +509,7 @@ def process_object_detection(yolo_model):
              st.session_state.result_image = None
 
 # Enhanced recommendations section
-def display_recommendations(filenames):
+def display_recommendations(thumbnails):
     with st.container():
         st.markdown("""
         <div class="card fade-in">
@@ -460,15 +521,16 @@ def display_recommendations(filenames):
             for i, img_name in enumerate(st.session_state.detected_image):
                 with cols[i]:
                     try:
-                        matching_files = [f for f in filenames if os.path.basename(f) == img_name]
-                        if matching_files:
-                            img_path = matching_files[0]
-                            st.image(
-                                img_path,
-                                use_column_width=True,
-                                caption=f"Inspiration {i+1}",
-                                output_format="PNG"
-                            )
+                        img_path = thumbnails.get(img_name)
+                        if img_path:
+                            # Prebuilt JPEG bytes are served as-is, without decoding or re-encoding
+                            with open(img_path, 'rb') as f:
+                                st.image(
+                                    f.read(),
+                                    use_column_width=True,
+                                    caption=f"Inspiration {i+1}",
+                                    output_format="JPEG"
+                                )
                         else:
                             st.error(f"Image {img_name} not found.")
                     except Exception as e:
@@ -478,22 +540,35 @@ def display_recommendations(filenames):
 
         st.markdown("</div>", unsafe_allow_html=True)
 
-def handle_recommendations(resnet_model, feature_list, filenames):
+def handle_recommendations(resnet_model, index, object_index, filenames, thumbnails):
     col1, col2, col3 = st.columns([1, 1, 1])
     with col2:
+        required_objects = st.multiselect(
+            "Only show rooms containing",
+            options=object_index.categories,
+            key="required_objects",
+            placeholder="Any objects"
+        )
         button_disabled = st.session_state.uploaded_file_path is None
         if enhanced_button("View Top Similar Rooms", key="find_similar", use_container_width=True, disabled=button_disabled):
             with st.spinner(" Warping Through Design Space..."):
                 try:
-                    features = utils.feature_extraction(
-                        st.session_state.uploaded_file_path,
-                        resnet_model
+                    features = analysis_result(
+                        "embedding",
+                        utils.feature_extraction,
+                        st.session_state.uploaded_image,
+                        resnet_model,
+                        service=models.load_inference_service()
                     )
                     if features is not None:
-                        indices = utils.recommend(features, feature_list)
-                        recommended_filenames = [os.path.basename(filenames[i]) for i in indices][:5]
+                        allowed = object_index.rows_containing(required_objects) if required_objects else None
+                        indices = utils.recommend(features, index, allowed=allowed)
+                        if len(indices) == 0:
+                            st.warning("No rooms contain all of the selected objects.")
+                            return
+                        recommended_filenames = [os.path.basename(normalize_filename(filenames[i])) for i in indices][:5]
                         st.session_state.detected_image = recommended_filenames 
-                        st.session_state.recommended_objects = utils.get_recommended_objects(recommended_filenames)
+                        st.session_state.recommended_objects = utils.get_recommended_objects(indices, object_index)
                         st.rerun() 
                     else:
                          st.warning("Could not extract features from the image.")
@@ -501,9 +576,9 @@ def handle_recommendations(resnet_model, feature_list, filenames):
                     st.error(f"Failed to get recommendations: {str(e)}")
 
     if st.session_state.detected_image:
-        display_recommendations(filenames) 
+        display_recommendations(thumbnails) 
 
-def process_main_flow(yolo_model, resnet_model, feature_list, filenames):
+def process_main_flow(yolo_model, resnet_model, index, object_index, filenames, thumbnails):
     handle_file_upload()
     if st.session_state.uploaded_file_path:
         display_image_columns(yolo_model)
@@ -511,7 +586,7 @@ def process_main_flow(yolo_model, resnet_model, feature_list, filenames):
         if not st.session_state.detected_objects:
             st.warning("⚠️ No objects detected. Please upload a picture with detectable furniture or decor.")
         else:
-            handle_recommendations(resnet_model, feature_list, filenames)
+            handle_recommendations(resnet_model, index, object_index, filenames, thumbnails)
 
 # Main function with enhanced UI
 def main():
@@ -531,10 +606,15 @@ def main():
     def load_models_and_features():
         yolo_model = models.load_yolo()
         resnet_model = models.load_resnet()
-        feature_list, filenames = models.load_features()
-        return yolo_model, resnet_model, feature_list, filenames
+        _, filenames = models.load_features()
+        index = models.load_index()
+        object_index = models.load_object_index()
+        thumbnails = models.load_thumbnails()
+        return yolo_model, resnet_model, index, object_index, filenames, thumbnails
 
-    yolo_model, resnet_model, feature_list, filenames = load_models_and_features()
+    yolo_model, resnet_model, index, object_index, filenames, thumbnails = load_models_and_features()
+    if lut_status() == 'stale':
+        st.warning("⚠️ The color-family lookup table no longer matches color_util; run build_color_lut.py.")
 
     with st.sidebar:
         render_sidebar_controls()
@@ -542,7 +622,7 @@ def main():
     if not st.session_state.landing_done:
         render_landing()
     else:
-        process_main_flow(yolo_model, resnet_model, feature_list, filenames)
+        process_main_flow(yolo_model, resnet_model, index, object_index, filenames, thumbnails)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,55 +1,143 @@
-import mysql.connector
+import argparse
+import time
 import traceback
-from modules.color_util import categorize_color_family  # Importing from your separate file
+from collections import Counter
 
-# ---------- Step 1: Connect to DB ----------
-print("🔄 Connecting to MySQL database...")
+from modules.color_util import categorize_color_families
 
-try:
-    db = mysql.connector.connect(
+# Replaces hex codes in products.color with their color family.
+# Families are computed once per distinct hex value and written to the
+# color_family_map table; products are then rewritten with one joined
+# UPDATE on MySQL, or chunked executemany statements keyed by hex value on
+# backends without UPDATE ... JOIN (e.g. the SQLite stand-in).
+# --dry-run only reports what would change.
+
+MAPPING_TABLE = "color_family_map"
+
+
+def connect_mysql():
+    import mysql.connector
+    return mysql.connector.connect(
         host="localhost",
         user="root",
         password="Pujan@111",
         database="product_db"
     )
-    print("✅ Connected to MySQL successfully!")
-except Exception as e:
-    print("❌ Could not connect to MySQL:", e)
-    traceback.print_exc()
-    exit()
 
-cursor = db.cursor()
 
-# ---------- Step 2: Get Products with Hex Colors ----------
-cursor.execute("SELECT id, color FROM products;")  # Fetch id and color (hex) instead of image_url
-products = cursor.fetchall()
-print(f"✅ Found {len(products)} products.")
+def hex_color_counts(db):
+    """Number of products per distinct hex value still stored in products.color."""
+    cursor = db.cursor()
+    cursor.execute("SELECT color, COUNT(*) FROM products WHERE color LIKE '#%' GROUP BY color")
+    counts = dict(cursor.fetchall())
+    cursor.close()
+    return counts
+
+
+def build_mapping(hex_codes):
+    """hex -> family for every valid code, plus the list of codes that could not be parsed."""
+    hex_codes = list(hex_codes)
+    families = categorize_color_families(hex_codes)
+    mapping = {hex_code: family for hex_code, family in zip(hex_codes, families) if isinstance(family, str)}
+    invalid = [hex_code for hex_code in hex_codes if hex_code not in mapping]
+    return mapping, invalid
+
+
+def write_mapping(db, placeholder, mapping):
+    p = placeholder
+    cursor = db.cursor()
+    cursor.execute(f"CREATE TABLE IF NOT EXISTS {MAPPING_TABLE} (hex VARCHAR(16) PRIMARY KEY, family VARCHAR(32) NOT NULL)")
+    cursor.execute(f"DELETE FROM {MAPPING_TABLE}")
+    cursor.executemany(f"INSERT INTO {MAPPING_TABLE} (hex, family) VALUES ({p}, {p})", sorted(mapping.items()))
+    cursor.close()
+
+
+def apply_mapping(db, placeholder, mapping, joined_update, chunk_size=500):
+    """Rewrite products.color from the mapping; returns the number of rows changed."""
+    p = placeholder
+    cursor = db.cursor()
+    if joined_update:
+        cursor.execute(f"UPDATE products p JOIN {MAPPING_TABLE} m ON p.color = m.hex SET p.color = m.family")
+        changed = cursor.rowcount
+    else:
+        changed = 0
+        items = sorted(mapping.items())
+        for start in range(0, len(items), chunk_size):
+            cursor.executemany(
+                f"UPDATE products SET color={p} WHERE color={p}",
+                [(family, hex_code) for hex_code, family in items[start:start + chunk_size]]
+            )
+            changed += cursor.rowcount
+    cursor.close()
+    return changed
 
-# ---------- Step 3: Process Products ----------
-for prod in products:
-    prod_id, hex_color = prod
-    print(f"\n🔄 Processing Product ID {prod_id}")
 
-    if not hex_color or not hex_color.startswith("#"):
-        print(f"⚠️ Invalid hex color for product {prod_id}: {hex_color}")
-        continue
+def recategorize(db, paramstyle='pyformat', joined_update=True, dry_run=False):
+    """
+    Map every hex value in products.color to its family in one pass
+    Returns: dict with distinct, products, invalid and changed counts
+    """
+    placeholder = '?' if paramstyle == 'qmark' else '%s'
+    started = time.perf_counter()
+    counts = hex_color_counts(db)
+    print(f"✅ Found {sum(counts.values())} products with {len(counts)} distinct hex colors "
+          f"({time.perf_counter() - started:.2f}s)")
 
+    started = time.perf_counter()
+    mapping, invalid = build_mapping(counts)
+    print(f"🎨 Categorized {len(mapping)} distinct colors ({time.perf_counter() - started:.3f}s)")
+    for hex_code in invalid:
+        print(f"⚠️ Invalid hex color {hex_code!r} on {counts[hex_code]} products, left unchanged")
+
+    stats = {
+        'distinct': len(counts),
+        'products': sum(counts[hex_code] for hex_code in mapping),
+        'invalid': sum(counts[hex_code] for hex_code in invalid),
+        'changed': 0,
+    }
+    if dry_run:
+        per_family = Counter()
+        for hex_code, family in mapping.items():
+            per_family[family] += counts[hex_code]
+        print(f"📝 Dry run: {stats['products']} products would change")
+        for family, n in per_family.most_common():
+            print(f"   {family:<14} {n:>7} products from {sum(1 for f in mapping.values() if f == family)} hex values")
+        return stats
+
+    started = time.perf_counter()
+    try:
+        write_mapping(db, placeholder, mapping)
+        stats['changed'] = apply_mapping(db, placeholder, mapping, joined_update)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    print(f"💾 Updated {stats['changed']} products ({time.perf_counter() - started:.2f}s)")
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replace product hex colors with color families")
+    parser.add_argument('--dry-run', action='store_true', help="report the changes without writing")
+    parser.add_argument('--sqlite', metavar='PATH', help="use a SQLite database instead of MySQL")
+    args = parser.parse_args()
+
+    print("🔄 Connecting to database...")
     try:
-        color_name = categorize_color_family(hex_color)  # Convert hex to color family name
-        print(f"🎨 Hex Color: {hex_color} -> {color_name}")
-        sql = "UPDATE products SET color=%s WHERE id=%s"
-        cursor.execute(sql, (color_name, prod_id))
-        print(f"✅ Updated product {prod_id} with color: {color_name}")
+        if args.sqlite:
+            import sqlite3
+            db, paramstyle = sqlite3.connect(args.sqlite), sqlite3.paramstyle
+        else:
+            import mysql.connector
+            db, paramstyle = connect_mysql(), mysql.connector.paramstyle
+        print("✅ Connected successfully!")
     except Exception as e:
-        print(f"❌ Error updating product {prod_id}:", e)
-
-# ---------- Step 4: Commit and Close ----------
-try:
-    db.commit()
-    print("💾 All changes committed to database.")
-except Exception as e:
-    print("❌ Commit failed:", e)
-
-cursor.close()
-db.close()
-print("✅ Script completed.")
\ No newline at end of file
+        print("❌ Could not connect to the database:", e)
+        traceback.print_exc()
+        exit()
+
+    try:
+        recategorize(db, paramstyle, joined_update=not args.sqlite, dry_run=args.dry_run)
+        print("✅ Script completed.")
+    finally:
+        db.close()
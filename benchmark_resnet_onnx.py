@@ -0,0 +1,58 @@
+import argparse
+import os
+import time
+import numpy as np
+from numpy.linalg import norm
+from tensorflow.keras.preprocessing import image
+from tensorflow.keras.applications.resnet50 import preprocess_input as keras_preprocess_input
+
+from modules.config import PATHS
+from modules.models import build_resnet
+from modules.onnx_backend import OnnxEmbeddingModel, preprocess_input
+
+# Parity and latency check of the ONNX Runtime embedding backends against Keras.
+# Fails (exit code 1) when any backend drifts below --min-cosine.
+parser = argparse.ArgumentParser(description="Compare ONNX Runtime embeddings with the Keras model")
+parser.add_argument('--source', default='uploads')
+parser.add_argument('--limit', type=int, default=32)
+parser.add_argument('--threads', type=int, default=0)
+parser.add_argument('--min-cosine', type=float, default=0.999, help="float32 parity threshold")
+parser.add_argument('--min-cosine-int8', type=float, default=0.97, help="int8 parity threshold")
+args = parser.parse_args()
+
+paths = sorted(os.path.join(args.source, f) for f in os.listdir(args.source))[:args.limit]
+pixels = np.stack([image.img_to_array(image.load_img(p, target_size=(224, 224))) for p in paths])
+
+keras_input = keras_preprocess_input(pixels.copy())
+numpy_input = preprocess_input(pixels)
+print(f"🔬 preprocess_input max |diff| keras vs numpy: {np.abs(keras_input - numpy_input).max():.2e}")
+
+def normalize(vectors):
+    return vectors / norm(vectors, axis=1, keepdims=True)
+
+def per_image_latency(model, batch):
+    model.predict(batch[:1], verbose=0)
+    start = time.perf_counter()
+    for i in range(len(batch)):
+        model.predict(batch[i:i + 1], verbose=0)
+    return (time.perf_counter() - start) * 1000 / len(batch)
+
+backends = {'keras': (build_resnet(), None)}
+if os.path.exists(PATHS['resnet_onnx']):
+    backends['onnx'] = (OnnxEmbeddingModel(PATHS['resnet_onnx'], args.threads), args.min_cosine)
+if os.path.exists(PATHS['resnet_onnx_int8']):
+    backends['onnx_int8'] = (OnnxEmbeddingModel(PATHS['resnet_onnx_int8'], args.threads), args.min_cosine_int8)
+
+reference = normalize(backends['keras'][0].predict(keras_input, verbose=0))
+failed = False
+print(f"{'backend':<10} {'ms/image':>9} {'min cos':>9} {'mean cos':>9}")
+for name, (model, threshold) in backends.items():
+    embeddings = normalize(model.predict(keras_input if name == 'keras' else numpy_input, verbose=0))
+    cosine = np.sum(embeddings * reference, axis=1)
+    latency = per_image_latency(model, keras_input if name == 'keras' else numpy_input)
+    print(f"{name:<10} {latency:>9.1f} {cosine.min():>9.5f} {cosine.mean():>9.5f}")
+    if threshold is not None and cosine.min() < threshold:
+        print(f"❌ {name} below parity threshold {threshold}")
+        failed = True
+
+raise SystemExit(1 if failed else 0)
@@ -0,0 +1,89 @@
+import argparse
+import os
+import time
+import numpy as np
+from ultralytics import YOLO
+
+from modules.config import PATHS, DETECTION
+from modules.detections import onnx_model_path, results_to_arrays
+from modules.onnx_detector import OnnxDetector
+
+# Latency and accuracy drift of the ONNX detector tiers against best.pt.
+# The corpus has no box labels, so PyTorch detections on the held-out rooms
+# are the reference and mAP measures how closely each tier reproduces them.
+parser = argparse.ArgumentParser(description="Benchmark ONNX detector tiers against the PyTorch model")
+parser.add_argument('--source', default='Livingroom')
+parser.add_argument('--holdout-every', type=int, default=20, help="use every Nth sorted image as the held-out set")
+parser.add_argument('--threads', type=int, default=0)
+args = parser.parse_args()
+
+paths = sorted(os.path.join(args.source, f) for f in os.listdir(args.source))[::args.holdout_every]
+
+def iou_matrix(a, b):
+    x1 = np.maximum(a[:, None, 0], b[None, :, 0])
+    y1 = np.maximum(a[:, None, 1], b[None, :, 1])
+    x2 = np.minimum(a[:, None, 2], b[None, :, 2])
+    y2 = np.minimum(a[:, None, 3], b[None, :, 3])
+    inter = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    return inter / (area_a[:, None] + area_b[None, :] - inter + 1e-9)
+
+def average_precision(predictions, references, cls, threshold):
+    """COCO-style 101-point AP for one class."""
+    scored = []
+    n_refs = 0
+    for pred, ref in zip(predictions, references):
+        ref_boxes = ref['boxes'][ref['classes'] == cls]
+        n_refs += len(ref_boxes)
+        mask = pred['classes'] == cls
+        boxes, confidences = pred['boxes'][mask], pred['confidences'][mask]
+        matched = np.zeros(len(ref_boxes), dtype=bool)
+        ious = iou_matrix(boxes, ref_boxes) if len(boxes) and len(ref_boxes) else np.zeros((len(boxes), 0))
+        for i in np.argsort(-confidences):
+            hit = False
+            if ious.shape[1]:
+                candidates = np.where(~matched & (ious[i] >= threshold))[0]
+                if len(candidates):
+                    matched[candidates[np.argmax(ious[i, candidates])]] = True
+                    hit = True
+            scored.append((confidences[i], hit))
+    if n_refs == 0:
+        return None
+    scored.sort(key=lambda item: -item[0])
+    hits = np.cumsum([hit for _, hit in scored])
+    recall = hits / n_refs
+    precision = hits / np.arange(1, len(scored) + 1)
+    precision = np.maximum.accumulate(precision[::-1])[::-1] if len(precision) else precision
+    return float(np.mean([precision[recall >= r].max() if np.any(recall >= r) else 0.0 for r in np.linspace(0, 1, 101)]))
+
+def mean_ap(predictions, references, names):
+    thresholds = np.arange(0.5, 0.96, 0.05)
+    per_threshold = []
+    for threshold in thresholds:
+        aps = [average_precision(predictions, references, cls, threshold) for cls in names]
+        aps = [ap for ap in aps if ap is not None]
+        per_threshold.append(np.mean(aps) if aps else 0.0)
+    return per_threshold[0], float(np.mean(per_threshold))
+
+def timed(model):
+    model.predict(paths[0], conf=DETECTION['conf'], verbose=False)
+    start = time.perf_counter()
+    outputs = [results_to_arrays(model.predict(path, conf=DETECTION['conf'], verbose=False)[0]) for path in paths]
+    return outputs, (time.perf_counter() - start) * 1000 / len(paths)
+
+torch_model = YOLO(PATHS['yolo_model'])
+references, torch_ms = timed(torch_model)
+names = list(torch_model.names)
+print(f"🔬 {len(paths)} held-out rooms from {args.source}/")
+print(f"{'backend':<18} {'ms/image':>9} {'mAP50':>7} {'mAP50-95':>9}")
+print(f"{'torch':<18} {torch_ms:>9.1f} {'ref':>7} {'ref':>9}")
+
+for tier, imgsz in DETECTION['tiers'].items():
+    if not os.path.exists(onnx_model_path(imgsz)):
+        print(f"{'onnx ' + tier:<18} not exported")
+        continue
+    detector = OnnxDetector(onnx_model_path(imgsz), imgsz=imgsz, iou=DETECTION['iou'], intra_op_threads=args.threads)
+    predictions, ms = timed(detector)
+    map50, map50_95 = mean_ap(predictions, references, names)
+    print(f"{'onnx ' + tier + f' ({imgsz})':<18} {ms:>9.1f} {map50:>7.3f} {map50_95:>9.3f}")
@@ -0,0 +1,19 @@
+import time
+import numpy as np
+
+from modules.config import PATHS
+from modules.color_lut import build_lut, save_lut, classifier_signature
+from modules.color_util import COLOR_FAMILIES
+
+# Materializes color_util's classifier as a 2^24 uint8 table of family ids
+# (16 MB, memory-mapped at runtime) plus the id -> name list and a signature
+# of the thresholds and code it was built from. color_lut.load_lut() ignores
+# the table once that signature no longer matches; re-run this script after
+# editing color_util.
+started = time.perf_counter()
+table = build_lut()
+save_lut(table, PATHS['color_lut'], PATHS['color_lut_meta'])
+counts = np.bincount(table, minlength=len(COLOR_FAMILIES))
+print(f"✅ Built {len(table):,} entries in {time.perf_counter() - started:.1f}s, "
+      f"{np.count_nonzero(counts)} families used, signature {classifier_signature()[:12]}")
+print(f"💾 Wrote {PATHS['color_lut']} and {PATHS['color_lut_meta']}")
@@ -0,0 +1,28 @@
+import argparse
+import time
+
+from modules.config import PATHS
+from modules.embedding_store import open_store, store_fingerprint
+from modules.ivf import train_ivf, calibrate_nprobe
+
+# Offline training of the IVF index read by models.load_index() when
+# SEARCH['engine'] == 'ivf'. Re-run whenever the embedding store changes.
+parser = argparse.ArgumentParser(description="Train the inverted-file index over the embedding store")
+parser.add_argument('--lists', type=int, default=None, help="number of coarse centroids (default 4*sqrt(n))")
+parser.add_argument('--iters', type=int, default=20, help="k-means iterations")
+parser.add_argument('--target-recall', type=float, default=0.95, help="recall@k the stored nprobe must reach")
+parser.add_argument('--k', type=int, default=5)
+args = parser.parse_args()
+
+feature_list, filenames = open_store(PATHS['embedding_matrix'], PATHS['embedding_ids'])
+print(f"🔄 Training IVF index on {len(feature_list)} embeddings...")
+
+start = time.perf_counter()
+index = train_ivf(feature_list, n_lists=args.lists, n_iter=args.iters)
+print(f"✅ {index.n_lists} posting lists trained in {time.perf_counter() - start:.1f}s")
+
+index.nprobe, recall = calibrate_nprobe(index, target_recall=args.target_recall, k=args.k)
+print(f"🎯 nprobe={index.nprobe} gives recall@{args.k}={recall:.3f}")
+
+index.save(PATHS['ivf_index'], store_fingerprint(feature_list, filenames))
+print(f"💾 Saved to {PATHS['ivf_index']}")
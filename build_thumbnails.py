@@ -0,0 +1,32 @@
+import argparse
+import os
+from PIL import Image, ImageOps
+from tqdm import tqdm
+
+from modules.config import PATHS
+from modules.embedding_store import open_store
+from modules.thumbnails import thumbnail_path
+
+# Pre-resized JPEGs for the "Our Inspirations" strip. The app serves these
+# bytes directly, so nothing is decoded or re-encoded per rerun.
+# Only missing or outdated thumbnails are regenerated.
+parser = argparse.ArgumentParser(description="Generate inspiration thumbnails for the room corpus")
+parser.add_argument('--max-size', type=int, default=480, help="longest edge in pixels")
+parser.add_argument('--quality', type=int, default=82, help="JPEG quality")
+args = parser.parse_args()
+
+_, filenames = open_store(PATHS['embedding_matrix'], PATHS['embedding_ids'])
+os.makedirs(PATHS['thumbnails'], exist_ok=True)
+
+written = 0
+for filename in tqdm(filenames):
+    target = thumbnail_path(filename)
+    if os.path.exists(target) and os.path.getmtime(target) >= os.path.getmtime(filename):
+        continue
+    with Image.open(filename) as img:
+        img = ImageOps.exif_transpose(img).convert('RGB')
+        img.thumbnail((args.max_size, args.max_size), Image.LANCZOS)
+        img.save(target, 'JPEG', quality=args.quality, optimize=True, progressive=True)
+    written += 1
+
+print(f"✅ {written} thumbnails written, {len(filenames) - written} up to date in {PATHS['thumbnails']}")
@@ -0,0 +1,44 @@
+import argparse
+import os
+import time
+import numpy as np
+from colorthief import ColorThief
+
+from modules.config import PALETTE
+from modules.ingest import DecodedImage
+from modules.palette import extract_palette
+
+# Compares the NumPy median-cut palette with ColorThief(quality=1) on the
+# full-resolution file. Distance is the mean RGB distance from each NumPy
+# colour to the closest ColorThief colour (0 = identical, 441 = black vs white).
+parser = argparse.ArgumentParser(description="Compare the NumPy palette engine with ColorThief")
+parser.add_argument('--source', default='uploads')
+parser.add_argument('--colors', type=int, default=4)
+parser.add_argument('--budget', type=int, default=PALETTE['sample_budget'], help="pixels sampled by the NumPy engine")
+args = parser.parse_args()
+
+def palette_distance(palette, reference):
+    palette, reference = np.array(palette, dtype=np.float64), np.array(reference, dtype=np.float64)
+    return np.linalg.norm(palette[:, None] - reference[None], axis=2).min(axis=1).mean()
+
+print(f"{'image':<28}{'colorthief ms':>15}{'numpy ms':>10}{'speedup':>9}{'distance':>10}")
+distances, speedups = [], []
+for name in sorted(os.listdir(args.source)):
+    path = os.path.join(args.source, name)
+    started = time.perf_counter()
+    reference = ColorThief(path).get_palette(color_count=args.colors, quality=1)
+    colorthief_ms = (time.perf_counter() - started) * 1000
+
+    img = DecodedImage.from_path(path)
+    started = time.perf_counter()
+    palette = extract_palette(img.palette_sample, args.colors, budget=args.budget)
+    numpy_ms = (time.perf_counter() - started) * 1000
+
+    distances.append(palette_distance(palette, reference))
+    speedups.append(colorthief_ms / numpy_ms)
+    print(f"{name:<28}{colorthief_ms:>15.0f}{numpy_ms:>10.1f}{speedups[-1]:>8.0f}x{distances[-1]:>10.1f}")
+    print(f"{'':<4}colorthief {['#%02x%02x%02x' % c for c in reference]}")
+    print(f"{'':<4}numpy      {['#%02x%02x%02x' % c for c in palette]}")
+
+if distances:
+    print(f"📊 {len(distances)} images: median speedup {np.median(speedups):.0f}x, mean distance {np.mean(distances):.1f}")
@@ -0,0 +1,28 @@
+import argparse
+import time
+import numpy as np
+
+from modules.config import PATHS
+from modules.embedding_store import open_store, store_fingerprint
+from modules.compression import fit_pca, compress, CompressedEmbeddings
+
+# Offline PCA + int8 compression of the embedding store, read by
+# models.load_index() when SEARCH['compression'] == 'pca_int8'.
+parser = argparse.ArgumentParser(description="Fit PCA and int8-quantize the embedding store")
+parser.add_argument('--dims', type=int, default=256, help="PCA output dimensions")
+parser.add_argument('--sample', type=int, default=50000, help="rows sampled to fit the projection")
+args = parser.parse_args()
+
+feature_list, filenames = open_store(PATHS['embedding_matrix'], PATHS['embedding_ids'])
+print(f"🔄 Fitting {args.dims}-d PCA on {min(args.sample, len(feature_list))} of {len(feature_list)} embeddings...")
+
+start = time.perf_counter()
+mean, components = fit_pca(feature_list, n_components=args.dims, sample_size=args.sample)
+codes, scales = compress(feature_list, mean, components)
+CompressedEmbeddings(codes, scales, mean, components, feature_list).save(
+    PATHS['pca_codes'], PATHS['pca_projection'], store_fingerprint(feature_list, filenames)
+)
+
+full_bytes = feature_list.shape[1] * np.dtype(feature_list.dtype).itemsize
+print(f"✅ Compressed in {time.perf_counter() - start:.1f}s: {full_bytes} → {codes.shape[1]} bytes per image")
+print(f"💾 Saved to {PATHS['pca_codes']} and {PATHS['pca_projection']}")
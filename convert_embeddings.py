@@ -0,0 +1,18 @@
+import argparse
+import pickle
+import numpy as np
+
+from modules.config import PATHS
+from modules.embedding_store import save_store
+
+# One-shot conversion of assets/embeddings.pkl + assets/filenames.pkl
+# into the memory-mapped store read by models.load_features().
+parser = argparse.ArgumentParser(description="Convert pickled embeddings to the memory-mapped store")
+parser.add_argument('--dtype', choices=['float32', 'float16'], default='float32')
+args = parser.parse_args()
+
+feature_list = pickle.load(open(PATHS['embeddings'], 'rb'))
+filenames = pickle.load(open(PATHS['filenames'], 'rb'))
+
+save_store(feature_list, filenames, PATHS['embedding_matrix'], PATHS['embedding_ids'], dtype=np.dtype(args.dtype))
+print(f"✅ Wrote {len(filenames)} embeddings ({args.dtype}) to {PATHS['embedding_matrix']}")
@@ -4,36 +4,137 @@ from tensorflow.keras.layers import GlobalMaxPooling2D
 from tensorflow.keras.applications.resnet50 import ResNet50,preprocess_input
 import numpy as np
 from numpy.linalg import norm
+import argparse
+import glob
 import os
+import time
 from tqdm import tqdm
-import pickle
+from modules.config import PATHS
+from modules.embedding_store import save_store, normalize_filename
+from modules.manifest import BuildManifest
 
-model = ResNet50(weights='imagenet',include_top=False,input_shape=(224,224,3))
-model.trainable = False
-
-model = tensorflow.keras.Sequential([
-    model,
-    GlobalMaxPooling2D()
-])
+# Incremental build: only new or changed images are embedded, results are
+# checkpointed per chunk under assets/embedding_build/, and an interrupted
+# run resumes from the last saved chunk. The live rows are then compacted
+# into the memory-mapped store read by models.load_features().
+# --pipelined overlaps image decoding with batched inference.
+parser = argparse.ArgumentParser(description="Build or update the room embedding store")
+parser.add_argument('--source', default='Livingroom', help="folder of room images")
+parser.add_argument('--chunk-size', type=int, default=256, help="images embedded between checkpoints")
+parser.add_argument('--pipelined', action='store_true', help="decode in a worker pool and run the model on batches")
+parser.add_argument('--batch-size', type=int, default=32, help="images per model call in pipelined mode")
+parser.add_argument('--workers', type=int, default=4, help="parallel image decoders in pipelined mode")
+parser.add_argument('--check-parity', type=int, default=0, metavar='N', help="compare N pipelined vectors with the per-image path")
+parser.add_argument('--rebuild', action='store_true', help="ignore the manifest and embed everything")
+args = parser.parse_args()
 
 def extract_features(img_path,model):
     img = image.load_img(img_path,target_size=(224,224))
     img_array = image.img_to_array(img)
     expanded_img_array = np.expand_dims(img_array, axis=0)
     preprocessed_img = preprocess_input(expanded_img_array)
-    result = model.predict(preprocessed_img).flatten()
+    result = model.predict(preprocessed_img, verbose=0).flatten()
     normalized_result = result / norm(result)
 
     return normalized_result
 
-filenames = []
-for file in os.listdir('Livingroom'):
-    filenames.append(os.path.join('Livingroom',file))
+def load_image(img_path):
+    # Same decode/resize as extract_features so both paths give identical pixels
+    img = image.load_img(img_path.decode('utf-8'),target_size=(224,224))
+    return image.img_to_array(img)
+
+def extract_features_batched(img_paths,model,batch_size,workers):
+    """
+    Decode and resize images on a tf.data worker pool while the model
+    consumes prefetched fixed-size batches.
+    """
+    dataset = tensorflow.data.Dataset.from_tensor_slices(img_paths)
+    dataset = dataset.map(
+        lambda path: tensorflow.ensure_shape(tensorflow.numpy_function(load_image, [path], tensorflow.float32), (224,224,3)),
+        num_parallel_calls=workers,
+        deterministic=True
+    )
+    dataset = dataset.batch(batch_size).prefetch(tensorflow.data.AUTOTUNE)
+
+    results = []
+    for batch in dataset:
+        results.append(model.predict_on_batch(preprocess_input(batch.numpy())))
+    result = np.concatenate(results)
+    return result / norm(result, axis=1, keepdims=True)
+
+def chunk_path(chunk_id):
+    return os.path.join(PATHS['embedding_build'], f'chunk_{chunk_id:05d}.npy')
+
+def next_chunk_id():
+    existing = glob.glob(os.path.join(PATHS['embedding_build'], 'chunk_*.npy'))
+    return max((int(os.path.basename(p)[6:11]) for p in existing), default=-1) + 1
+
+def compact(manifest):
+    """Gather the live rows of every chunk into the embedding store and drop unused chunks."""
+    live = manifest.live()
+    chunks = {}
+    feature_list = []
+    for path, entry in live:
+        if entry['chunk'] not in chunks:
+            chunks[entry['chunk']] = np.load(chunk_path(entry['chunk']), mmap_mode='r')
+        feature_list.append(chunks[entry['chunk']][entry['row']])
+    save_store(feature_list, [path for path, _ in live], PATHS['embedding_matrix'], PATHS['embedding_ids'])
+
+    for stale in glob.glob(os.path.join(PATHS['embedding_build'], 'chunk_*.npy')):
+        if int(os.path.basename(stale)[6:11]) not in chunks:
+            os.remove(stale)
+    return len(feature_list)
+
+manifest = BuildManifest(PATHS['embedding_manifest'])
+if args.rebuild:
+    manifest.entries = {}
+
+filenames = [normalize_filename(os.path.join(args.source, file)) for file in os.listdir(args.source)]
+pending, deleted = manifest.plan(filenames)
+
+for path in deleted:
+    manifest.tombstone(path)
+print(f"🔄 {len(pending)} new or changed, {len(deleted)} deleted, {len(filenames) - len(pending)} up to date")
+
+if pending:
+    model = ResNet50(weights='imagenet',include_top=False,input_shape=(224,224,3))
+    model.trainable = False
+
+    model = tensorflow.keras.Sequential([
+        model,
+        GlobalMaxPooling2D()
+    ])
 
-feature_list = []
+    if args.pipelined and args.check_parity:
+        sample = [file for file, *_ in pending[:args.check_parity]]
+        batched = extract_features_batched(sample, model, args.batch_size, args.workers)
+        single = np.array([extract_features(file,model) for file in sample])
+        print(f"🔬 Pipelined vs per-image on {len(sample)} images: max |diff| {np.abs(batched - single).max():.2e}, "
+              f"min cosine {np.min(np.sum(batched * single, axis=1)):.6f}")
 
-for file in tqdm(filenames):
-    feature_list.append(extract_features(file,model))
+    os.makedirs(PATHS['embedding_build'], exist_ok=True)
+    chunk_id = next_chunk_id()
+    started = time.perf_counter()
+    with tqdm(total=len(pending)) as progress:
+        for start in range(0, len(pending), args.chunk_size):
+            chunk = pending[start:start + args.chunk_size]
+            if args.pipelined:
+                feature_list = extract_features_batched([file for file, *_ in chunk], model, args.batch_size, args.workers)
+                progress.update(len(chunk))
+            else:
+                feature_list = []
+                for file, sha, mtime, size in chunk:
+                    feature_list.append(extract_features(file,model))
+                    progress.update(1)
+            np.save(chunk_path(chunk_id), np.asarray(feature_list, dtype=np.float32))
+            for row, (file, sha, mtime, size) in enumerate(chunk):
+                manifest.record(file, sha, mtime, size, chunk=chunk_id, row=row)
+            manifest.save()
+            chunk_id += 1
+    elapsed = time.perf_counter() - started
+    print(f"⚡ Embedded {len(pending)} images in {elapsed:.1f}s ({len(pending) / elapsed:.1f} images/sec)")
 
-pickle.dump(feature_list,open('embeddings.pkl','wb'))
-pickle.dump(filenames,open('filenames.pkl','wb'))
\ No newline at end of file
+manifest.save()
+print(f"💾 Wrote {compact(manifest)} embeddings to {PATHS['embedding_matrix']}")
+if pending or deleted:
+    print("ℹ️ Re-run build_ivf_index.py / compress_embeddings.py if you use those search modes")
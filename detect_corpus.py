@@ -0,0 +1,102 @@
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+import pandas as pd
+import torch
+from tqdm import tqdm
+from ultralytics import YOLO
+
+from modules.config import PATHS, DETECTION
+from modules.analysis_cache import model_version
+from modules.embedding_store import normalize_filename
+from modules.manifest import BuildManifest
+from modules.object_index import save_object_table
+
+# Regenerates the per-image object table from best.pt over the room corpus.
+# Batches of images are spread over a process pool; finished batches are
+# recorded in assets/detection_build/manifest.json, so an interrupted run
+# resumes and later runs only detect new or changed files. A new best.pt
+# invalidates every entry. Writes assets/detected_objects.npz, which
+# models.load_object_index() prefers, and the legacy detected_objects.csv.
+
+_model = None
+
+def init_worker(model_path, threads):
+    global _model
+    if threads:
+        torch.set_num_threads(threads)
+    _model = YOLO(model_path)
+
+def detect_batch(paths, conf):
+    """Per-class box counts and max confidences for a batch of images."""
+    results = _model.predict(paths, conf=conf, batch=len(paths), verbose=False)
+    n_classes = len(_model.names)
+    rows = []
+    for path, result in zip(paths, results):
+        classes = result.boxes.cls.cpu().numpy().astype(np.int64)
+        confidences = result.boxes.conf.cpu().numpy()
+        counts = np.bincount(classes, minlength=n_classes)
+        max_confidence = np.zeros(n_classes, dtype=np.float32)
+        np.maximum.at(max_confidence, classes, confidences)
+        rows.append((path, counts.tolist(), max_confidence.tolist()))
+    return rows
+
+def write_outputs(manifest, names):
+    live = manifest.live()
+    classes = [names[i] for i in range(len(names))]
+    images = [os.path.basename(path) for path, _ in live]
+    counts = np.array([entry['counts'] for _, entry in live], dtype=np.uint16).reshape(len(live), len(classes))
+    max_confidence = np.array([entry['max_confidence'] for _, entry in live], dtype=np.float32).reshape(len(live), len(classes))
+    save_object_table(PATHS['objects_table'], images, classes, counts, max_confidence)
+
+    # Compatibility CSV: one Python set literal of class names per image
+    pd.DataFrame({
+        'image': images,
+        'detected_objects': [str({classes[c] for c in np.flatnonzero(row)}) for row in counts],
+    }).to_csv(PATHS['objects_csv'], index=False)
+    return len(live)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Detect objects in the room corpus and rebuild the object table")
+    parser.add_argument('--source', default='Livingroom', help="folder of room images")
+    parser.add_argument('--batch-size', type=int, default=16, help="images per model call")
+    parser.add_argument('--workers', type=int, default=2, help="detector processes")
+    parser.add_argument('--threads', type=int, default=0, help="torch threads per process (0 = default)")
+    parser.add_argument('--rebuild', action='store_true', help="ignore the manifest and detect everything")
+    args = parser.parse_args()
+
+    version = f"{model_version(PATHS['yolo_model'])}-conf{DETECTION['conf']}"
+    manifest = BuildManifest(PATHS['objects_manifest'])
+    if args.rebuild:
+        manifest.entries = {}
+    stale = [path for path, entry in manifest.entries.items() if entry.get('model') != version and not entry.get('deleted')]
+    for path in stale:
+        del manifest.entries[path]
+
+    filenames = [normalize_filename(os.path.join(args.source, file)) for file in os.listdir(args.source)]
+    pending, deleted = manifest.plan(filenames)
+    for path in deleted:
+        manifest.tombstone(path)
+    print(f"🔄 {len(pending)} new or changed, {len(deleted)} deleted, {len(filenames) - len(pending)} up to date")
+
+    if pending:
+        stats = {path: (sha, mtime, size) for path, sha, mtime, size in pending}
+        batches = [[path for path, *_ in pending[i:i + args.batch_size]] for i in range(0, len(pending), args.batch_size)]
+        started = time.perf_counter()
+        with ProcessPoolExecutor(args.workers, initializer=init_worker, initargs=(PATHS['yolo_model'], args.threads)) as pool:
+            futures = [pool.submit(detect_batch, batch, DETECTION['conf']) for batch in batches]
+            with tqdm(total=len(pending)) as progress:
+                for future in as_completed(futures):
+                    rows = future.result()
+                    for path, counts, max_confidence in rows:
+                        manifest.record(path, *stats[path], model=version, counts=counts, max_confidence=max_confidence)
+                    manifest.save()
+                    progress.update(len(rows))
+        elapsed = time.perf_counter() - started
+        print(f"⚡ Detected {len(pending)} images in {elapsed:.1f}s ({len(pending) / elapsed:.1f} images/sec)")
+
+    names = YOLO(PATHS['yolo_model']).names
+    manifest.save()
+    print(f"💾 Wrote {write_outputs(manifest, names)} rows to {PATHS['objects_table']} and {PATHS['objects_csv']}")
@@ -0,0 +1,54 @@
+import argparse
+import os
+import random
+import numpy as np
+import tensorflow as tf
+import tf2onnx
+from PIL import Image
+from onnxruntime.quantization import CalibrationDataReader, QuantFormat, QuantType, quantize_static
+
+from modules.config import PATHS
+from modules.models import build_resnet
+from modules.onnx_backend import preprocess_input
+
+# Exports the room-embedding model (ResNet50 + GlobalMaxPooling2D) to ONNX and,
+# optionally, a static int8-quantized copy calibrated on corpus images.
+# Select the runtime with EMBEDDING['backend'] in modules/config.py.
+parser = argparse.ArgumentParser(description="Export the embedding model to ONNX")
+parser.add_argument('--quantize', action='store_true', help="also write a static int8 model")
+parser.add_argument('--calibration-images', type=int, default=128)
+parser.add_argument('--source', default='Livingroom')
+args = parser.parse_args()
+
+class CorpusCalibrationReader(CalibrationDataReader):
+    def __init__(self, paths, input_name):
+        self.paths = iter(paths)
+        self.input_name = input_name
+
+    def get_next(self):
+        path = next(self.paths, None)
+        if path is None:
+            return None
+        # Same decode/resize as keras image.load_img(target_size=(224, 224))
+        img = Image.open(path).convert('RGB').resize((224, 224), Image.NEAREST)
+        return {self.input_name: preprocess_input(np.asarray(img)[np.newaxis])}
+
+model = build_resnet()
+spec = (tf.TensorSpec((None, 224, 224, 3), tf.float32, name='input'),)
+tf2onnx.convert.from_keras(model, input_signature=spec, opset=17, output_path=PATHS['resnet_onnx'])
+print(f"✅ Exported {PATHS['resnet_onnx']}")
+
+if args.quantize:
+    files = sorted(os.listdir(args.source))
+    random.Random(0).shuffle(files)
+    paths = [os.path.join(args.source, file) for file in files[:args.calibration_images]]
+    quantize_static(
+        PATHS['resnet_onnx'],
+        PATHS['resnet_onnx_int8'],
+        CorpusCalibrationReader(paths, 'input'),
+        quant_format=QuantFormat.QDQ,
+        activation_type=QuantType.QInt8,
+        weight_type=QuantType.QInt8,
+        per_channel=True
+    )
+    print(f"✅ Quantized with {len(paths)} calibration images: {PATHS['resnet_onnx_int8']}")
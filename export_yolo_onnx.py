@@ -0,0 +1,19 @@
+import argparse
+import os
+import shutil
+from ultralytics import YOLO
+
+from modules.config import PATHS, DETECTION
+from modules.detections import onnx_model_path
+
+# Exports best.pt to ONNX once per input-resolution tier in DETECTION['tiers'].
+# Set DETECTION['backend'] = 'onnx' and pick DETECTION['tier'] to use them.
+parser = argparse.ArgumentParser(description="Export the YOLO detector to ONNX for each resolution tier")
+parser.add_argument('--tiers', nargs='*', default=list(DETECTION['tiers']), help="tiers to export")
+args = parser.parse_args()
+
+for tier in args.tiers:
+    imgsz = DETECTION['tiers'][tier]
+    exported = YOLO(PATHS['yolo_model']).export(format='onnx', imgsz=imgsz, simplify=True, dynamic=False)
+    shutil.move(exported, onnx_model_path(imgsz))
+    print(f"✅ {tier} ({imgsz}px): {onnx_model_path(imgsz)} ({os.path.getsize(onnx_model_path(imgsz)) / 1e6:.1f} MB)")
@@ -1,24 +1,41 @@
-from .config import PATHS
-from .models import load_yolo, load_resnet, load_features
-from .utils import (
-    save_uploaded_file,
-    feature_extraction,
-    recommend,
-    detect_objects,
-    get_recommended_objects
-)
-from .components import inject_css, render_header
+import importlib
 
-__all__ = [
-    'PATHS',
-    'load_yolo',
-    'load_resnet',
-    'load_features',
-    'save_uploaded_file',
-    'feature_extraction',
-    'recommend',
-    'detect_objects',
-    'get_recommended_objects',
-    'inject_css',
-    'render_header'
-]
\ No newline at end of file
+# Attributes are resolved on first access so that pages which only need the
+# catalog (Preferences, Packages, Explore) never import TensorFlow or ultralytics.
+_LAZY_ATTRIBUTES = {
+    'PATHS': 'config',
+    'load_yolo': 'models',
+    'load_resnet': 'models',
+    'load_features': 'models',
+    'load_index': 'models',
+    'load_object_index': 'models',
+    'save_uploaded_file': 'utils',
+    'feature_extraction': 'utils',
+    'feature_extraction_batch': 'utils',
+    'recommend': 'utils',
+    'recommend_batch': 'utils',
+    'detect_objects': 'utils',
+    'get_recommended_objects': 'utils',
+    'load_product_data': 'catalog',
+    'load_catalog_metadata': 'catalog',
+    'inject_css': 'components',
+    'render_header': 'components'
+}
+
+__all__ = list(_LAZY_ATTRIBUTES)
+
+def __getattr__(name):
+    if name in _LAZY_ATTRIBUTES:
+        value = getattr(importlib.import_module(f'.{_LAZY_ATTRIBUTES[name]}', __name__), name)
+    else:
+        try:
+            value = importlib.import_module(f'.{name}', __name__)
+        except ModuleNotFoundError as e:
+            if e.name != f'{__name__}.{name}':
+                raise
+            raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -1,74 +1,188 @@
-import mysql.connector
-import requests
+import argparse
+import os
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
 from io import BytesIO
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from colorthief import ColorThief
-import traceback
 
-print("🔄 Connecting to MySQL database...")
+# Backfills products.color1..color3 from each product image.
+# Images are fetched over one pooled requests.Session by a bounded thread pool
+# and palettes are extracted in a process pool. Every chunk of updates is
+# committed together with its ids in the color_backfill_done table, so a
+# crash loses at most one chunk and a rerun skips products already done.
+# backfill() takes any DB-API connection; pass paramstyle='qmark' for SQLite.
 
-try:
-    db = mysql.connector.connect(
+CHECKPOINT_TABLE = "color_backfill_done"
+
+
+def connect_mysql():
+    import mysql.connector
+    return mysql.connector.connect(
         host="localhost",
         user="root",
         password="Pujan@111",
         database="product_db"
     )
-    print("✅ Connected to MySQL successfully!")
-except Exception as e:
-    print("❌ Could not connect to MySQL:", e)
-    traceback.print_exc()
-    exit()
 
-cursor = db.cursor()
 
-cursor.execute("SELECT id, image_url FROM products;")
-products = cursor.fetchall()
-print(f"✅ Found {len(products)} products.")
+def make_session(pool_size, retries=3):
+    """HTTP session whose connection pool is sized for pool_size concurrent fetches."""
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=pool_size,
+        pool_maxsize=pool_size,
+        max_retries=Retry(total=retries, backoff_factor=0.5, status_forcelist=(429, 500, 502, 503, 504))
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
 
 
-def get_dominant_colors(image_url, num_colors=3):
+def fetch_image(session, image_url, timeout=20):
     try:
-        response = requests.get(image_url)
+        response = session.get(image_url, timeout=timeout)
         if response.status_code == 200:
-            img = BytesIO(response.content)
-            color_thief = ColorThief(img)
-            palette = color_thief.get_palette(color_count=num_colors)
-            hex_colors = ['#%02x%02x%02x' % color for color in palette]
-            return hex_colors
-        else:
-            print(f"❌ Failed to fetch image: {image_url} | Status Code: {response.status_code}")
-            return [None] * num_colors
+            return response.content
+        print(f"❌ Failed to fetch image: {image_url} | Status Code: {response.status_code}")
     except Exception as e:
         print(f"❌ Error fetching {image_url}: {e}")
-        return [None] * num_colors
-
-
-for prod in products:
-    prod_id, image_url = prod
-    print(f"\n🔄 Processing Product ID {prod_id}")
-
-    if not image_url or not image_url.startswith("http"):
-        print(f"⚠️ Invalid image URL for product {prod_id}: {image_url}")
-        continue
-
-    colors = get_dominant_colors(image_url)
-    if colors and None not in colors:
-        print(f"🎨 Extracted Colors: {colors}")
-        try:
-            sql = "UPDATE products SET color1=%s, color2=%s, color3=%s WHERE id=%s"
-            cursor.execute(sql, (colors[0], colors[1], colors[2], prod_id))
-            print(f"✅ Updated product {prod_id} successfully.")
-        except Exception as e:
-            print(f"❌ Error updating product {prod_id}:", e)
-    else:
-        print(f"⚠️ Skipped product {prod_id} due to missing or invalid colors.")
-
-try:
+    return None
+
+
+def get_dominant_colors(content, num_colors=3):
+    """Hex palette of an encoded image; runs in the palette worker processes."""
+    try:
+        palette = ColorThief(BytesIO(content)).get_palette(color_count=num_colors)
+        hex_colors = ['#%02x%02x%02x' % color for color in palette]
+        return hex_colors if len(hex_colors) >= num_colors else None
+    except Exception as e:
+        print(f"❌ Error extracting colors: {e}")
+        return None
+
+
+def ensure_checkpoint_table(db):
+    cursor = db.cursor()
+    cursor.execute(f"CREATE TABLE IF NOT EXISTS {CHECKPOINT_TABLE} (product_id INTEGER PRIMARY KEY, finished_at DOUBLE NOT NULL)")
     db.commit()
-    print("💾 All changes committed to database.")
-except Exception as e:
-    print("❌ Commit failed:", e)
+    cursor.close()
+
+
+def pending_products(db):
+    """(id, image_url) of products without a checkpoint row."""
+    cursor = db.cursor()
+    cursor.execute(f"""
+        SELECT p.id, p.image_url FROM products p
+        LEFT JOIN {CHECKPOINT_TABLE} d ON d.product_id = p.id
+        WHERE d.product_id IS NULL
+        ORDER BY p.id
+    """)
+    rows = cursor.fetchall()
+    cursor.close()
+    return rows
 
-cursor.close()
-db.close()
-print("✅ Script completed.")
+
+def write_chunk(db, placeholder, updates):
+    """Apply (product_id, colors) updates and checkpoint their ids in one transaction."""
+    p = placeholder
+    cursor = db.cursor()
+    try:
+        cursor.executemany(
+            f"UPDATE products SET color1={p}, color2={p}, color3={p} WHERE id={p}",
+            [(colors[0], colors[1], colors[2], prod_id) for prod_id, colors in updates]
+        )
+        now = time.time()
+        cursor.executemany(
+            f"INSERT INTO {CHECKPOINT_TABLE} (product_id, finished_at) VALUES ({p}, {p})",
+            [(prod_id, now) for prod_id, _ in updates]
+        )
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+def backfill(db, paramstyle='pyformat', fetch_workers=16, palette_workers=None, chunk_size=200, num_colors=3, session=None):
+    """
+    Fill color1..color3 for every product not yet checkpointed
+    Returns: dict with updated, skipped and failed counts
+    """
+    placeholder = '?' if paramstyle == 'qmark' else '%s'
+    session = session or make_session(fetch_workers)
+    ensure_checkpoint_table(db)
+    products = pending_products(db)
+    print(f"✅ Found {len(products)} products without colors.")
+
+    stats = {'updated': 0, 'skipped': 0, 'failed': 0}
+    valid = []
+    for prod_id, image_url in products:
+        if not image_url or not image_url.startswith("http"):
+            print(f"⚠️ Invalid image URL for product {prod_id}: {image_url}")
+            stats['skipped'] += 1
+        else:
+            valid.append((prod_id, image_url))
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(fetch_workers) as fetchers, ProcessPoolExecutor(palette_workers) as extractors:
+        for start in range(0, len(valid), chunk_size):
+            chunk = valid[start:start + chunk_size]
+            # Each palette job starts as soon as its image arrives; at most one chunk of images is held in memory
+            fetches = {fetchers.submit(fetch_image, session, image_url): prod_id for prod_id, image_url in chunk}
+            palettes = {}
+            for future in as_completed(fetches):
+                content = future.result()
+                if content is None:
+                    stats['failed'] += 1
+                    continue
+                palettes[extractors.submit(get_dominant_colors, content, num_colors)] = fetches[future]
+
+            updates = []
+            for future in as_completed(palettes):
+                colors = future.result()
+                if colors:
+                    updates.append((palettes[future], colors))
+                else:
+                    print(f"⚠️ Skipped product {palettes[future]} due to missing or invalid colors.")
+                    stats['failed'] += 1
+            if updates:
+                write_chunk(db, placeholder, sorted(updates))
+            stats['updated'] += len(updates)
+            elapsed = time.perf_counter() - started
+            print(f"💾 Committed {stats['updated']} products "
+                  f"({start + len(chunk)}/{len(valid)}, {(start + len(chunk)) / elapsed:.1f} products/sec)")
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backfill product palette colors from product images")
+    parser.add_argument('--fetch-workers', type=int, default=16, help="concurrent image downloads")
+    parser.add_argument('--palette-workers', type=int, default=os.cpu_count(), help="palette extraction processes")
+    parser.add_argument('--chunk-size', type=int, default=200, help="products per committed chunk")
+    parser.add_argument('--sqlite', metavar='PATH', help="use a SQLite database instead of MySQL")
+    args = parser.parse_args()
+
+    print("🔄 Connecting to database...")
+    try:
+        if args.sqlite:
+            import sqlite3
+            db, paramstyle = sqlite3.connect(args.sqlite), sqlite3.paramstyle
+        else:
+            import mysql.connector
+            db, paramstyle = connect_mysql(), mysql.connector.paramstyle
+        print("✅ Connected successfully!")
+    except Exception as e:
+        print("❌ Could not connect to the database:", e)
+        traceback.print_exc()
+        exit()
+
+    try:
+        stats = backfill(db, paramstyle, args.fetch_workers, args.palette_workers, args.chunk_size)
+        print(f"✅ Script completed: {stats['updated']} updated, {stats['skipped']} skipped, {stats['failed']} failed.")
+    finally:
+        db.close()
@@ -0,0 +1,152 @@
+import contextlib
+import functools
+import hashlib
+import io
+import json
+import os
+import sqlite3
+import tempfile
+import time
+import numpy as np
+
+from .config import PATHS, ANALYSIS_CACHE
+
+
+@functools.lru_cache(maxsize=256)
+def _sha256_of(path, mtime, size):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def content_hash(path):
+    """SHA-256 of a file's bytes, memoized on (path, mtime, size)."""
+    stat = os.stat(path)
+    return _sha256_of(os.path.abspath(path), stat.st_mtime, stat.st_size)
+
+
+class AnalysisCache:
+    """
+    Disk-backed cache of per-image analysis results keyed by the image's content hash.
+    Metadata lives in SQLite, arrays in .npz blobs; least recently used entries
+    are evicted once the total size exceeds max_bytes.
+    """
+
+    def __init__(self, directory, max_bytes):
+        self.directory = directory
+        self.blob_dir = os.path.join(directory, 'blobs')
+        self.db_path = os.path.join(directory, 'index.sqlite')
+        self.max_bytes = max_bytes
+        os.makedirs(self.blob_dir, exist_ok=True)
+        with self._connect() as db:
+            db.execute("""
+                CREATE TABLE IF NOT EXISTS entries (
+                    image_hash TEXT NOT NULL,
+                    kind TEXT NOT NULL,
+                    version TEXT NOT NULL,
+                    blob TEXT,
+                    payload TEXT,
+                    nbytes INTEGER NOT NULL,
+                    last_access REAL NOT NULL,
+                    PRIMARY KEY (image_hash, kind, version)
+                )
+            """)
+            db.execute("CREATE INDEX IF NOT EXISTS entries_lru ON entries (last_access)")
+
+    @contextlib.contextmanager
+    def _connect(self):
+        # One short-lived connection per call keeps this safe across Streamlit session threads
+        db = sqlite3.connect(self.db_path, timeout=10)
+        try:
+            db.execute("PRAGMA journal_mode=WAL")
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    def get(self, image_hash, kind, version):
+        """
+        Look up a cached result
+        Returns: (arrays dict or None, payload) or None on a miss
+        """
+        with self._connect() as db:
+            row = db.execute(
+                "SELECT blob, payload FROM entries WHERE image_hash=? AND kind=? AND version=?",
+                (image_hash, kind, version)
+            ).fetchone()
+            if row is None:
+                return None
+            blob, payload = row
+            arrays = None
+            if blob:
+                try:
+                    with np.load(os.path.join(self.blob_dir, blob)) as data:
+                        arrays = {name: data[name] for name in data.files}
+                except OSError:
+                    db.execute("DELETE FROM entries WHERE image_hash=? AND kind=? AND version=?", (image_hash, kind, version))
+                    return None
+            db.execute(
+                "UPDATE entries SET last_access=? WHERE image_hash=? AND kind=? AND version=?",
+                (time.time(), image_hash, kind, version)
+            )
+        return arrays, json.loads(payload) if payload is not None else None
+
+    def put(self, image_hash, kind, version, arrays=None, payload=None):
+        blob = None
+        nbytes = 0
+        if arrays is not None:
+            buffer = io.BytesIO()
+            np.savez(buffer, **arrays)
+            blob = f"{image_hash}_{kind}_{hashlib.sha1(version.encode()).hexdigest()[:12]}.npz"
+            # Unique temp name so concurrent writers of the same blob never share a partial file
+            fd, tmp_path = tempfile.mkstemp(suffix='.tmp', dir=self.blob_dir)
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(buffer.getvalue())
+                os.replace(tmp_path, os.path.join(self.blob_dir, blob))
+            except BaseException:
+                with contextlib.suppress(OSError):
+                    os.remove(tmp_path)
+                raise
+            nbytes += buffer.tell()
+        payload = json.dumps(payload) if payload is not None else None
+        nbytes += len(payload or '')
+
+        with self._connect() as db:
+            db.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (image_hash, kind, version, blob, payload, nbytes, time.time())
+            )
+            self._evict(db)
+
+    def _evict(self, db):
+        total = db.execute("SELECT COALESCE(SUM(nbytes), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for image_hash, kind, version, blob, nbytes in db.execute(
+            "SELECT image_hash, kind, version, blob, nbytes FROM entries ORDER BY last_access"
+        ).fetchall():
+            if total <= self.max_bytes:
+                break
+            db.execute("DELETE FROM entries WHERE image_hash=? AND kind=? AND version=?", (image_hash, kind, version))
+            if blob:
+                try:
+                    os.remove(os.path.join(self.blob_dir, blob))
+                except FileNotFoundError:
+                    pass
+            total -= nbytes
+
+
+@functools.lru_cache(maxsize=1)
+def get_cache():
+    """Process-wide cache instance, or None when disabled in config."""
+    if not ANALYSIS_CACHE['enabled']:
+        return None
+    return AnalysisCache(PATHS['analysis_cache'], ANALYSIS_CACHE['max_bytes'])
+
+
+def model_version(model_path):
+    """Cache version for results produced by a model file; changes whenever the weights do."""
+    return content_hash(model_path)[:16]
@@ -0,0 +1,105 @@
+import os
+import pandas as pd
+import streamlit as st
+
+from .color_util import extract_category_colors
+
+
+def catalog_version(csv_path):
+    """Changes whenever the catalog file is rewritten; every catalog cache is keyed on it."""
+    stat = os.stat(csv_path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def read_catalog(csv_path, version):
+    return pd.read_csv(csv_path)
+
+
+# Columns CatalogMetadata.from_frame reads
+METADATA_COLUMNS = ['product_category', 'color', 'price']
+
+
+def missing_columns(df, required):
+    return [col for col in required if col not in df.columns]
+
+
+def clean_product_data(df):
+    missing = missing_columns(df, ['product_category', 'color'])
+    if missing:
+        st.error(f"❌ Missing required columns: {', '.join(missing)}")
+        st.stop()
+    return _normalize_product_data(df)
+
+
+def _normalize_product_data(df):
+    """clean_product_data without the column check, safe to call from cached builders."""
+    df.dropna(subset=['product_category', 'color'], inplace=True)
+    df['color'] = df['color'].astype(str).str.strip()
+    df['product_category'] = df['product_category'].astype(str).str.strip()
+    df = df[df['product_category'] != '']
+    df = df[df['color'] != '']
+    return df.drop_duplicates()
+
+
+def load_product_data(csv_path):
+    return clean_product_data(read_catalog(csv_path, catalog_version(csv_path)))
+
+
+class CatalogMetadata:
+    """
+    Per-category facts shared by the Preferences, Packages and Explore pages:
+    sorted color families, and min/max/mean/count of price in catalog order.
+    Built once per catalog_version(); treat it as read-only.
+    """
+
+    def __init__(self, version, category_colors, price_stats):
+        self.version = version
+        self.category_colors = category_colors
+        self.price_stats = price_stats
+
+    @classmethod
+    def from_frame(cls, df, version):
+        missing = missing_columns(df, METADATA_COLUMNS)
+        if missing:
+            raise ValueError(f"Missing required columns: {', '.join(missing)}")
+        # Colors and prices come from the same cleaned rows, so every category key matches
+        products = _normalize_product_data(df.copy())
+        category_colors = extract_category_colors(products)
+        prices = products.assign(price=pd.to_numeric(products['price'], errors='coerce')).dropna(subset=['price'])
+        price_stats = prices.groupby('product_category', sort=False)['price'].agg(['min', 'max', 'mean', 'count'])
+        return cls(version, category_colors, price_stats)
+
+    @property
+    def categories(self):
+        """Categories with at least one priced product, in catalog order."""
+        return self.price_stats.index.tolist()
+
+    def min_price(self, category):
+        return self.price_stats.at[category, 'min'] if category in self.price_stats.index else None
+
+    def avg_prices(self):
+        return self.price_stats['mean'].to_dict()
+
+    def min_max(self):
+        return {cat: (row['min'], row['max']) for cat, row in self.price_stats.iterrows()}
+
+    def price_range(self, category=None):
+        """(min, max) price of one category, or of the whole catalog."""
+        if category is not None:
+            return tuple(self.price_stats.loc[category, ['min', 'max']])
+        return self.price_stats['min'].min(), self.price_stats['max'].max()
+
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def _catalog_metadata(csv_path, version):
+    return CatalogMetadata.from_frame(read_catalog(csv_path, version), version)
+
+
+def load_catalog_metadata(csv_path):
+    # The cached builder only raises; reporting to the page happens out here
+    try:
+        return _catalog_metadata(csv_path, catalog_version(csv_path))
+    except ValueError as e:
+        st.error(f"❌ {e}")
+        st.stop()
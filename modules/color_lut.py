@@ -0,0 +1,80 @@
+import functools
+import hashlib
+import inspect
+import json
+import os
+import numpy as np
+
+from . import color_util
+from .config import PATHS
+
+# Module-level names the table is derived from; editing any of them makes a built table stale
+THRESHOLD_NAMES = [
+    'VERY_LOW_SAT', 'LOW_SAT', 'MED_SAT', 'VERY_HIGH_LIGHT', 'HIGH_LIGHT', 'LOW_LIGHT', 'VERY_LOW_LIGHT',
+]
+
+_status = {'state': None}
+
+
+def classifier_signature():
+    """SHA-256 of the thresholds, family list and classifier source the table encodes."""
+    digest = hashlib.sha256()
+    digest.update(json.dumps({name: getattr(color_util, name) for name in THRESHOLD_NAMES}).encode())
+    digest.update(json.dumps(color_util.COLOR_FAMILIES).encode())
+    for function in (color_util._rgb_to_hls, color_util.classify_rgb_codes):
+        digest.update(inspect.getsource(function).encode())
+    return digest.hexdigest()
+
+
+def rgb_index(rgb):
+    """Flat 24-bit index of each (..., 3) uint8 RGB triple."""
+    rgb = np.asarray(rgb, dtype=np.uint32)
+    return (rgb[..., 0] << 16) | (rgb[..., 1] << 8) | rgb[..., 2]
+
+
+def build_lut(chunk_size=1 << 20):
+    """Family code of every 24-bit RGB colour, in rgb_index order."""
+    table = np.empty(1 << 24, dtype=np.uint8)
+    for start in range(0, 1 << 24, chunk_size):
+        index = np.arange(start, start + chunk_size, dtype=np.uint32)
+        rgb = np.stack([(index >> 16) & 255, (index >> 8) & 255, index & 255], axis=1).astype(np.uint8)
+        table[start:start + chunk_size] = color_util.classify_rgb_codes(rgb)
+    return table
+
+
+def save_lut(table, path, meta_path):
+    tmp_path = path + '.tmp.npy'
+    np.save(tmp_path, table)
+    os.replace(tmp_path, path)
+    with open(meta_path, 'w', encoding='utf-8') as f:
+        json.dump({'signature': classifier_signature(), 'families': color_util.COLOR_FAMILIES}, f)
+
+
+@functools.lru_cache(maxsize=1)
+def load_lut():
+    """
+    Memory-mapped table from build_color_lut.py, checked against the current classifier
+    Returns: the table, or None when it is missing or stale (callers then compute families directly)
+    """
+    if not (os.path.exists(PATHS['color_lut']) and os.path.exists(PATHS['color_lut_meta'])):
+        _status['state'] = 'missing'
+        return None
+    with open(PATHS['color_lut_meta'], encoding='utf-8') as f:
+        meta = json.load(f)
+    if meta['signature'] != classifier_signature() or meta['families'] != color_util.COLOR_FAMILIES:
+        _status['state'] = 'stale'
+        print(f"⚠️ {PATHS['color_lut']} was built from different color_util thresholds; ignoring it. Re-run build_color_lut.py.")
+        return None
+    _status['state'] = 'ok'
+    return np.load(PATHS['color_lut'], mmap_mode='r')
+
+
+def lut_status():
+    """'ok', 'missing' or 'stale' for the table on disk."""
+    load_lut()
+    return _status['state']
+
+
+def lookup_codes(table, rgb):
+    """Family codes for an RGB array of any (..., 3) shape with one fancy-index lookup."""
+    return np.asarray(table[rgb_index(rgb)])
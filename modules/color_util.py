@@ -1,4 +1,7 @@
-import colorsys
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
 
 def hex_to_rgb(hex_code):
 # converting hex color code to RGB tuple
@@ -9,103 +12,174 @@ def hex_to_rgb(hex_code):
         raise ValueError(f"Invalid hex code: {hex_code}")
     return tuple(int(hex_code[i:i+2], 16) for i in (0, 2, 4))
 
+# Threshold constants
+VERY_LOW_SAT = 0.1   # Achromatic threshold
+LOW_SAT = 0.25       # Desaturated/pastel threshold
+MED_SAT = 0.5        # Medium saturation
+VERY_HIGH_LIGHT = 0.9  # Near-white
+HIGH_LIGHT = 0.75    # Light shades
+LOW_LIGHT = 0.25     # Dark shades
+VERY_LOW_LIGHT = 0.15  # Near-black
+
+# Categories of the Categorical returned by categorize_color_families
+COLOR_FAMILIES = [
+    "Black", "White", "Gray", "Light Pink", "Peach", "Cream", "Mint", "Pale Aqua", "Sky Blue", "Lavender",
+    "Dusty Pink", "Beige", "Taupe", "Olive Drab", "Slate", "Mauve", "Apricot", "Celadon", "Turquoise",
+    "Dark Olive", "Steel Blue", "Maroon", "Blush", "Red", "Rose", "Rust", "Coral", "Orange", "Terracotta",
+    "Bronze", "Yellow", "Gold", "Khaki", "Dark Green", "Olive", "Lime", "Forest Green", "Green", "Sage",
+    "Teal", "Aqua", "Cyan", "Navy", "Blue", "Denim", "Indigo", "Purple", "Burgundy", "Pink", "Magenta",
+    "Dusty Rose", "Other",
+]
+
+# ASCII -> nibble value, -1 for characters that are not hex digits
+_HEX_DIGITS = np.full(256, -1, dtype=np.int16)
+for _i, _c in enumerate('0123456789abcdef'):
+    _HEX_DIGITS[ord(_c)] = _HEX_DIGITS[ord(_c.upper())] = _i
+
 def categorize_color_family(hex_code):
     """Categorizing color based on HLS values."""
-    r, g, b = hex_to_rgb(hex_code)
-    h, l, s = colorsys.rgb_to_hls(r/255, g/255, b/255)
-    hue_deg = h * 360
-
-    # Threshold constants
-    VERY_LOW_SAT = 0.1   # Achromatic threshold
-    LOW_SAT = 0.25       # Desaturated/pastel threshold
-    MED_SAT = 0.5        # Medium saturation
-    VERY_HIGH_LIGHT = 0.9  # Near-white
-    HIGH_LIGHT = 0.75    # Light shades
-    LOW_LIGHT = 0.25     # Dark shades
-    VERY_LOW_LIGHT = 0.15  # Near-black
-
-    # Achromatic colors
-    if s < VERY_LOW_SAT:
-        if l < VERY_LOW_LIGHT: return "Black"
-        if l > VERY_HIGH_LIGHT: return "White"
-        return "Gray"
-
-    # Desaturated and pastel colors
-    if s < LOW_SAT:
-        if l > HIGH_LIGHT:
-            if 0 <= hue_deg < 15 or 345 <= hue_deg < 360: return "Light Pink"
-            if 15 <= hue_deg < 45: return "Peach"
-            if 45 <= hue_deg < 70: return "Cream"
-            if 70 <= hue_deg < 150: return "Mint"
-            if 150 <= hue_deg < 190: return "Pale Aqua"
-            if 190 <= hue_deg < 255: return "Sky Blue"
-            if 255 <= hue_deg < 285: return "Lavender"
-            if 285 <= hue_deg < 345: return "Dusty Pink"
-        elif LOW_LIGHT < l < HIGH_LIGHT:
-            if 15 <= hue_deg < 45: return "Beige"
-            if 45 <= hue_deg < 70: return "Taupe"
-            if 70 <= hue_deg < 100: return "Olive Drab"
-            if 190 <= hue_deg < 255: return "Slate"
-            if 255 <= hue_deg < 285: return "Mauve"
-
-    # Medium saturation colors
-    if s < MED_SAT:
-        if l > HIGH_LIGHT:
-            if 15 <= hue_deg < 45: return "Apricot"
-            if 70 <= hue_deg < 150: return "Celadon"
-            if 150 <= hue_deg < 190: return "Turquoise"
-        elif l < LOW_LIGHT:
-            if 70 <= hue_deg < 150: return "Dark Olive"
-            if 190 <= hue_deg < 255: return "Steel Blue"
-
-    # Chromatic colors with light/dark/vivid variants
-    if hue_deg < 15 or hue_deg >= 345:
-        if l < LOW_LIGHT: return "Maroon"
-        if l > HIGH_LIGHT: return "Blush"
-        return "Red" if s > MED_SAT else "Rose"
-    elif 15 <= hue_deg < 40:
-        if l < LOW_LIGHT: return "Rust"
-        if l > HIGH_LIGHT: return "Coral"
-        return "Orange" if s > MED_SAT else "Terracotta"
-    elif 40 <= hue_deg < 70:
-        if l < LOW_LIGHT: return "Bronze"
-        if l > HIGH_LIGHT and s > MED_SAT: return "Yellow"
-        if l > HIGH_LIGHT: return "Cream"
-        return "Gold" if s > 0.6 else "Khaki"
-    elif 70 <= hue_deg < 100:
-        if l < LOW_LIGHT: return "Dark Green"
-        if l > HIGH_LIGHT: return "Mint"
-        return "Olive" if s < 0.6 else "Lime"
-    elif 100 <= hue_deg < 150:
-        if l < LOW_LIGHT: return "Forest Green"
-        if l > HIGH_LIGHT: return "Celadon"
-        return "Green" if s > MED_SAT else "Sage"
-    elif 150 <= hue_deg < 190:
-        if l < LOW_LIGHT: return "Teal"
-        if l > HIGH_LIGHT: return "Aqua"
-        return "Cyan" if s > MED_SAT else "Turquoise"
-    elif 190 <= hue_deg < 240:
-        if l < LOW_LIGHT: return "Navy"
-        if l > HIGH_LIGHT: return "Sky Blue"
-        return "Blue" if s > MED_SAT else "Denim"
-    elif 240 <= hue_deg < 285:
-        if l < LOW_LIGHT: return "Indigo"
-        if l > HIGH_LIGHT: return "Lavender"
-        return "Purple" if s > MED_SAT else "Mauve"
-    elif 285 <= hue_deg < 345:
-        if l < LOW_LIGHT: return "Burgundy"
-        if l > HIGH_LIGHT: return "Pink"
-        return "Magenta" if s > MED_SAT else "Dusty Rose"
-
-    return "Other"  # Fallback (minimized with broader categories)
+    rgb = np.array([hex_to_rgb(hex_code)], dtype=np.uint8)
+    # Scalar path for callers in loops: one table lookup, no Series or Categorical
+    from .color_lut import load_lut, lookup_codes
+    table = load_lut()
+    if table is None:
+        return _classify_rgb(tuple(rgb[0].tolist()))
+    return COLOR_FAMILIES[int(lookup_codes(table, rgb)[0])]
+
+@lru_cache(maxsize=4096)
+def _classify_rgb(rgb):
+    """Family name of one (r, g, b) tuple when there is no lookup table."""
+    return COLOR_FAMILIES[int(classify_rgb_codes(np.array([rgb], dtype=np.uint8))[0])]
+
+def _parse_hex_codes(hex_codes):
+    """
+    Vectorized hex_to_rgb over a Series of hex strings
+    Returns: (n, 3) uint8 RGB array and a boolean mask of the rows that parsed
+    """
+    codes = hex_codes.where(hex_codes.map(lambda c: isinstance(c, str)), '').str.lstrip('#')
+    codes = codes.where(codes.str.len() != 3, codes.str.replace(r'(.)', r'\1\1', regex=True))
+    valid = (codes.str.len() == 6).to_numpy().copy()
+    rgb = np.zeros((len(codes), 3), dtype=np.uint8)
+    if valid.any():
+        chars = np.frombuffer(''.join(codes[valid]).encode('latin-1', 'replace'), dtype=np.uint8).reshape(-1, 6)
+        nibbles = _HEX_DIGITS[chars]
+        parsed = (nibbles >= 0).all(axis=1)
+        rgb[np.flatnonzero(valid)[parsed]] = (nibbles[parsed, 0::2] * 16 + nibbles[parsed, 1::2]).astype(np.uint8)
+        valid[np.flatnonzero(valid)[~parsed]] = False
+    # int(..., 16) also accepts a few oddities (e.g. " 1" or "+f"); defer those to hex_to_rgb itself
+    for i in np.flatnonzero(~valid):
+        try:
+            rgb[i] = hex_to_rgb(hex_codes.iloc[i])
+            valid[i] = True
+        except Exception:
+            pass
+    return rgb, valid
+
+def _rgb_to_hls(rgb):
+    """colorsys.rgb_to_hls over an (n, 3) array, operation for operation so results match bit for bit."""
+    r, g, b = (rgb.astype(np.float64) / 255).T
+    maxc = np.maximum(np.maximum(r, g), b)
+    minc = np.minimum(np.minimum(r, g), b)
+    sumc = maxc + minc
+    rangec = maxc - minc
+    l = sumc / 2.0
+    gray = minc == maxc
+    with np.errstate(divide='ignore', invalid='ignore'):
+        s = np.where(l <= 0.5, rangec / sumc, rangec / (2.0 - maxc - minc))
+        rc = (maxc - r) / rangec
+        gc = (maxc - g) / rangec
+        bc = (maxc - b) / rangec
+    h = np.where(r == maxc, bc - gc, np.where(g == maxc, 2.0 + rc - bc, 4.0 + gc - rc))
+    h = np.mod(h / 6.0, 1.0)
+    return np.where(gray, 0.0, h), l, np.where(gray, 0.0, s)
+
+def categorize_color_families(colors):
+    """
+    Vectorized categorize_color_family for an (n, 3) uint8 RGB array or a Series/list of hex codes
+    Returns: pd.Categorical over COLOR_FAMILIES, NaN where a hex code is invalid
+    """
+    if isinstance(colors, np.ndarray) and colors.ndim == 2:
+        rgb, valid = colors.astype(np.uint8), np.ones(len(colors), dtype=bool)
+    else:
+        rgb, valid = _parse_hex_codes(pd.Series(colors, dtype=object).reset_index(drop=True))
+    # Imported here because color_lut derives its table from this module
+    from .color_lut import load_lut, lookup_codes
+    table = load_lut()
+    codes = lookup_codes(table, rgb) if table is not None else classify_rgb_codes(rgb)
+    codes = codes.astype(np.int16)
+    codes[~valid] = -1
+    return pd.Categorical.from_codes(codes, categories=COLOR_FAMILIES)
+
+def classify_rgb_codes(rgb):
+    """Index into COLOR_FAMILIES of each row of an (n, 3) uint8 RGB array, from its hue, lightness and saturation."""
+    h, l, s = _rgb_to_hls(rgb)
+    hue = h * 360
+    def hue_in(lo, hi):
+        return (lo <= hue) & (hue < hi)
+
+    light, mid, dark = l > HIGH_LIGHT, (LOW_LIGHT < l) & (l < HIGH_LIGHT), l < LOW_LIGHT
+    achromatic, pastel, medium = s < VERY_LOW_SAT, s < LOW_SAT, s < MED_SAT
+    vivid = s > MED_SAT
+
+    # Rules are checked in list order and a colour takes the family of the first one it matches:
+    # achromatic, then pastel, then medium saturation, then the hue bands; anything left is "Other"
+    rules = [
+        (achromatic & (l < VERY_LOW_LIGHT), "Black"),
+        (achromatic & (l > VERY_HIGH_LIGHT), "White"),
+        (achromatic, "Gray"),
+        (pastel & light & (hue_in(0, 15) | hue_in(345, 360)), "Light Pink"),
+        (pastel & light & hue_in(15, 45), "Peach"),
+        (pastel & light & hue_in(45, 70), "Cream"),
+        (pastel & light & hue_in(70, 150), "Mint"),
+        (pastel & light & hue_in(150, 190), "Pale Aqua"),
+        (pastel & light & hue_in(190, 255), "Sky Blue"),
+        (pastel & light & hue_in(255, 285), "Lavender"),
+        (pastel & light & hue_in(285, 345), "Dusty Pink"),
+        (pastel & ~light & mid & hue_in(15, 45), "Beige"),
+        (pastel & ~light & mid & hue_in(45, 70), "Taupe"),
+        (pastel & ~light & mid & hue_in(70, 100), "Olive Drab"),
+        (pastel & ~light & mid & hue_in(190, 255), "Slate"),
+        (pastel & ~light & mid & hue_in(255, 285), "Mauve"),
+        (medium & light & hue_in(15, 45), "Apricot"),
+        (medium & light & hue_in(70, 150), "Celadon"),
+        (medium & light & hue_in(150, 190), "Turquoise"),
+        (medium & ~light & dark & hue_in(70, 150), "Dark Olive"),
+        (medium & ~light & dark & hue_in(190, 255), "Steel Blue"),
+    ]
+    hue_bands = [
+        ((hue < 15) | (hue >= 345), [(dark, "Maroon"), (light, "Blush"), (vivid, "Red"), (True, "Rose")]),
+        (hue_in(15, 40), [(dark, "Rust"), (light, "Coral"), (vivid, "Orange"), (True, "Terracotta")]),
+        (hue_in(40, 70), [(dark, "Bronze"), (light & vivid, "Yellow"), (light, "Cream"), (s > 0.6, "Gold"), (True, "Khaki")]),
+        (hue_in(70, 100), [(dark, "Dark Green"), (light, "Mint"), (s < 0.6, "Olive"), (True, "Lime")]),
+        (hue_in(100, 150), [(dark, "Forest Green"), (light, "Celadon"), (vivid, "Green"), (True, "Sage")]),
+        (hue_in(150, 190), [(dark, "Teal"), (light, "Aqua"), (vivid, "Cyan"), (True, "Turquoise")]),
+        (hue_in(190, 240), [(dark, "Navy"), (light, "Sky Blue"), (vivid, "Blue"), (True, "Denim")]),
+        (hue_in(240, 285), [(dark, "Indigo"), (light, "Lavender"), (vivid, "Purple"), (True, "Mauve")]),
+        (hue_in(285, 345), [(dark, "Burgundy"), (light, "Pink"), (vivid, "Magenta"), (True, "Dusty Rose")]),
+    ]
+    # The hue bands are an if/elif chain, so each band only applies where the earlier ones did not
+    unmatched = np.ones(len(rgb), dtype=bool)
+    for band, variants in hue_bands:
+        band = band & unmatched
+        rules += [(band & condition, family) for condition, family in variants]
+        unmatched &= ~band
+
+    code_of = {family: i for i, family in enumerate(COLOR_FAMILIES)}
+    return np.select(
+        [np.broadcast_to(condition, len(rgb)) for condition, _ in rules],
+        [code_of[family] for _, family in rules],
+        default=code_of["Other"]
+    ).astype(np.uint8)
 
 def group_colors_by_family(color_list):
+    color_list = list(color_list)
     families = {}
-    for color in color_list:
-        try:
-            family = categorize_color_family(color)
-        except Exception as e:
-            family = f"Invalid: {str(e)}"
+    for color, family in zip(color_list, categorize_color_families(color_list)):
+        if pd.isna(family):
+            try:
+                family = categorize_color_family(color)
+            except Exception as e:
+                family = f"Invalid: {str(e)}"
         families.setdefault(family, []).append(color)
     return families
 
@@ -0,0 +1,125 @@
+import os
+import numpy as np
+
+from .similarity import top_k, cosine_to_euclidean, stack_query_results
+
+# Rows of int8 codes upcast to float32 at a time while scoring
+BLOCK_ROWS = 65536
+
+
+def fit_pca(feature_list, n_components=256, sample_size=50000, seed=0):
+    """
+    Fit a PCA projection on a sample of the embedding matrix
+    Returns: (mean, components) with components shaped (n_components, d)
+    """
+    rng = np.random.default_rng(seed)
+    sample_ids = np.sort(rng.choice(len(feature_list), min(sample_size, len(feature_list)), replace=False))
+    sample = np.asarray(feature_list[sample_ids], dtype=np.float64)
+    mean = sample.mean(axis=0)
+    _, _, vt = np.linalg.svd(sample - mean, full_matrices=False)
+    return mean.astype(np.float32), vt[:n_components].astype(np.float32)
+
+
+def compress(feature_list, mean, components):
+    """
+    Project every row with the PCA basis and scalar-quantize to int8.
+    Each output dimension gets its own symmetric scale.
+    Returns: (codes, scales)
+    """
+    projected = np.empty((len(feature_list), len(components)), dtype=np.float32)
+    for start in range(0, len(feature_list), BLOCK_ROWS):
+        block = np.asarray(feature_list[start:start + BLOCK_ROWS], dtype=np.float32)
+        projected[start:start + len(block)] = (block - mean) @ components.T
+    scales = np.maximum(np.abs(projected).max(axis=0), 1e-12) / 127.0
+    codes = np.clip(np.rint(projected / scales), -127, 127).astype(np.int8)
+    return codes, scales.astype(np.float32)
+
+
+class CompressedEmbeddings:
+    """PCA + int8 codes for the corpus, backed by the full-precision matrix for re-ranking."""
+
+    def __init__(self, codes, scales, mean, components, full):
+        self.codes = codes
+        self.scales = scales
+        self.mean = mean
+        self.components = components
+        self.full = full
+
+    def __len__(self):
+        return len(self.codes)
+
+    def save(self, codes_path, projection_path, fingerprint):
+        """fingerprint is embedding_store.store_fingerprint() of the store the codes were built from."""
+        np.save(codes_path, self.codes)
+        np.savez(
+            projection_path,
+            scales=self.scales,
+            mean=self.mean,
+            components=self.components,
+            fingerprint=np.str_(fingerprint)
+        )
+
+    @classmethod
+    def load(cls, codes_path, projection_path, full, fingerprint):
+        codes = np.load(codes_path, mmap_mode='r')
+        if len(codes) != len(full):
+            raise ValueError(f"{codes_path} has {len(codes)} rows, embedding store has {len(full)}")
+        projection = np.load(projection_path)
+        if 'fingerprint' not in projection.files or str(projection['fingerprint']) != fingerprint:
+            raise ValueError(f"{codes_path} was built from a different version of the embedding store")
+        return cls(codes, projection['scales'], projection['mean'], projection['components'], full)
+
+    @staticmethod
+    def exists(codes_path, projection_path):
+        return os.path.exists(codes_path) and os.path.exists(projection_path)
+
+
+class CompressedIndex:
+    """
+    Two-stage top-k search: score the int8 codes against the projected query,
+    then re-rank a short list with full vectors read from the memmap.
+    """
+
+    def __init__(self, embeddings, rerank=50):
+        self.embeddings = embeddings
+        self.rerank = rerank
+
+    def __len__(self):
+        return len(self.embeddings)
+
+    def approximate_scores(self, features, ids=None):
+        # x . q = (x - mean) . q + mean . q, and the second term is the same for
+        # every row, so ranking on P(x - mean) . P(q) approximates ranking on x . q
+        query = np.asarray(features, dtype=np.float32).ravel() @ self.embeddings.components.T
+        query *= self.embeddings.scales
+        codes = self.embeddings.codes
+        n_rows = len(codes) if ids is None else len(ids)
+        scores = np.empty(n_rows, dtype=np.float32)
+        for start in range(0, n_rows, BLOCK_ROWS):
+            rows = slice(start, start + BLOCK_ROWS) if ids is None else ids[start:start + BLOCK_ROWS]
+            block = np.asarray(codes[rows], dtype=np.float32)
+            scores[start:start + len(block)] = block @ query
+        return scores
+
+    def query(self, features, k=5, allowed=None):
+        """
+        Find the k rooms closest to a normalized query vector.
+        `allowed` is an optional boolean row mask applied before the scan.
+        Returns: (euclidean distances, row indices), nearest first
+        """
+        query = np.asarray(features, dtype=np.float32).ravel()
+        ids = None if allowed is None else np.flatnonzero(allowed)
+        shortlist = top_k(self.approximate_scores(query, ids), max(k, self.rerank))
+        shortlist = np.sort(shortlist if ids is None else ids[shortlist])
+        scores = np.asarray(self.embeddings.full[shortlist], dtype=np.float32) @ query
+        best = top_k(scores, k)
+        return cosine_to_euclidean(scores[best]), shortlist[best]
+
+    def query_batch(self, queries, k=5, **params):
+        """
+        Top-k for every row of an (n, d) query matrix, one query at a time since
+        each query re-ranks its own short list.
+        Returns: (distances, indices), each shaped (n, k), nearest first; see stack_query_results
+        """
+        queries = np.asarray(queries, dtype=np.float32).reshape(-1, self.embeddings.full.shape[1])
+        return stack_query_results([self.query(query, k, **params) for query in queries], min(k, len(self)))
@@ -6,6 +6,80 @@ ASSETS_DIR = os.path.join(BASE_DIR, 'assets')
 PATHS = {
     'embeddings': os.path.join(ASSETS_DIR, 'embeddings.pkl'),
     'filenames': os.path.join(ASSETS_DIR, 'filenames.pkl'),
+    'embedding_matrix': os.path.join(ASSETS_DIR, 'embeddings.npy'),
+    'embedding_ids': os.path.join(ASSETS_DIR, 'filenames.txt'),
+    'embedding_build': os.path.join(ASSETS_DIR, 'embedding_build'),
+    'embedding_manifest': os.path.join(ASSETS_DIR, 'embedding_build', 'manifest.json'),
+    'ivf_index': os.path.join(ASSETS_DIR, 'ivf_index.npz'),
+    'pca_codes': os.path.join(ASSETS_DIR, 'embeddings_pca_int8.npy'),
+    'pca_projection': os.path.join(ASSETS_DIR, 'embeddings_pca.npz'),
+    'thumbnails': os.path.join(ASSETS_DIR, 'thumbnails'),
+    'resnet_onnx': os.path.join(ASSETS_DIR, 'resnet50_gmp.onnx'),
+    'resnet_onnx_int8': os.path.join(ASSETS_DIR, 'resnet50_gmp_int8.onnx'),
     'yolo_model': os.path.join(ASSETS_DIR, 'best.pt'),
-    'objects_csv': os.path.join(ASSETS_DIR, 'detected_objects.csv')
-}
\ No newline at end of file
+    'objects_csv': os.path.join(ASSETS_DIR, 'detected_objects.csv'),
+    'objects_table': os.path.join(ASSETS_DIR, 'detected_objects.npz'),
+    'objects_manifest': os.path.join(ASSETS_DIR, 'detection_build', 'manifest.json'),
+    'color_lut': os.path.join(ASSETS_DIR, 'color_family_lut.npy'),
+    'color_lut_meta': os.path.join(ASSETS_DIR, 'color_family_lut.json'),
+    'analysis_cache': os.path.join(BASE_DIR, 'cache', 'analysis'),
+}
+
+# Similar-room search: 'exact' scans every embedding, 'ivf' scans the
+# posting lists of the nprobe nearest coarse centroids (see build_ivf_index.py).
+# nprobe=None uses the value calibrated when the index was built.
+# compression='pca_int8' makes load_index() search the PCA/int8 codes from
+# compress_embeddings.py and re-rank the top `rerank` rows against the
+# full-precision matrix.
+SEARCH = {
+    'engine': 'exact',
+    'nprobe': None,
+    'compression': None,
+    'rerank': 100,
+}
+
+# Per-upload analysis results (detections, embedding, palette) keyed by image hash
+ANALYSIS_CACHE = {
+    'enabled': True,
+    'max_bytes': 256 * 1024 * 1024,
+}
+
+# Room-embedding runtime: 'keras', 'onnx' or 'onnx_int8' (see export_resnet_onnx.py).
+# intra_op_threads=0 lets ONNX Runtime pick the thread count.
+EMBEDDING = {
+    'backend': 'keras',
+    'intra_op_threads': 0,
+}
+
+# Object detector: backend 'torch' runs best.pt through ultralytics, 'onnx' runs
+# the export from export_yolo_onnx.py at the input resolution of the chosen tier.
+DETECTION = {
+    'conf': 0.3,
+    'iou': 0.7,
+    'backend': 'torch',
+    'tier': 'accurate',
+    'tiers': {'fast': 320, 'balanced': 480, 'accurate': 640},
+    'intra_op_threads': 0,
+}
+
+# Shared inference worker: pending detection/embedding requests from all
+# sessions are coalesced into batches of up to max_batch_size, waiting at
+# most max_wait_ms for a batch to fill.
+INFERENCE = {
+    'enabled': True,
+    'max_batch_size': 8,
+    'max_wait_ms': 10,
+}
+# Per-upload analysis: detection, palette and embedding start together on a
+# thread pool shared by all sessions as soon as an upload is saved.
+ANALYSIS_SCHEDULER = {
+    'max_workers': 6,
+}
+
+# Dominant-colour extraction: 'numpy' runs the vectorized median cut in
+# modules/palette.py on at most sample_budget pixels; 'colorthief' keeps the
+# original ColorThief(quality=1) path (see compare_palettes.py).
+PALETTE = {
+    'engine': 'numpy',
+    'sample_budget': 20000,
+}
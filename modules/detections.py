@@ -0,0 +1,44 @@
+import os
+import cv2
+import numpy as np
+
+from .config import ASSETS_DIR, PATHS, DETECTION
+
+
+def onnx_model_path(imgsz):
+    return os.path.join(ASSETS_DIR, f'best_{imgsz}.onnx')
+
+
+def detector_model_path():
+    """Weights file used by the configured detection backend."""
+    if DETECTION['backend'] == 'onnx':
+        return onnx_model_path(DETECTION['tiers'][DETECTION['tier']])
+    return PATHS['yolo_model']
+
+
+def results_to_arrays(results):
+    """Raw box arrays from an ultralytics Results object."""
+    boxes = results.boxes
+    return {
+        'boxes': boxes.xyxy.cpu().numpy().astype(np.float32),
+        'confidences': boxes.conf.cpu().numpy().astype(np.float32),
+        'classes': boxes.cls.cpu().numpy().astype(np.int32),
+    }
+
+
+def results_from_arrays(image_path, names, boxes, confidences, classes, orig_img=None):
+    """
+    Rebuild an ultralytics Results object from raw box arrays, so callers
+    such as process_object_detection can keep using .boxes, .names and .plot().
+    """
+    # Imported here so the cache and palette paths that import this module do not load torch
+    import torch
+    from ultralytics.engine.results import Results
+    if orig_img is None:
+        orig_img = cv2.imread(image_path)
+    data = np.column_stack([
+        np.asarray(boxes, dtype=np.float32).reshape(-1, 4),
+        np.asarray(confidences, dtype=np.float32),
+        np.asarray(classes, dtype=np.float32),
+    ])
+    return Results(orig_img, path=image_path, names=names, boxes=torch.from_numpy(data))
@@ -0,0 +1,63 @@
+import hashlib
+import os
+import numpy as np
+
+
+def normalize_filename(path):
+    """Store corpus paths with forward slashes so basename() works on every OS."""
+    return str(path).replace('\\', '/')
+
+
+def save_store(feature_list, filenames, matrix_path, filenames_path, dtype=np.float32):
+    """
+    Write embeddings as one contiguous .npy matrix plus a row-ordered filename table.
+    Row i of the matrix belongs to line i of the filename table.
+    """
+    matrix = np.ascontiguousarray(np.asarray(feature_list, dtype=dtype))
+    if matrix.ndim != 2 or len(matrix) != len(filenames):
+        raise ValueError(f"Embedding matrix {matrix.shape} does not match {len(filenames)} filenames")
+
+    os.makedirs(os.path.dirname(matrix_path) or '.', exist_ok=True)
+    tmp_matrix = matrix_path + '.tmp'
+    with open(tmp_matrix, 'wb') as f:
+        np.save(f, matrix)
+    tmp_filenames = filenames_path + '.tmp'
+    with open(tmp_filenames, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(normalize_filename(name) for name in filenames))
+    os.replace(tmp_matrix, matrix_path)
+    os.replace(tmp_filenames, filenames_path)
+
+
+def open_store(matrix_path, filenames_path):
+    """
+    Open the embedding matrix read-only through np.memmap.
+    Pages are loaded lazily and shared between worker processes via the OS cache.
+    """
+    matrix = np.load(matrix_path, mmap_mode='r')
+    with open(filenames_path, encoding='utf-8') as f:
+        filenames = f.read().splitlines()
+    if len(filenames) != len(matrix):
+        raise ValueError(f"{filenames_path} has {len(filenames)} rows, expected {len(matrix)}")
+    return matrix, filenames
+
+
+# Rows hashed at a time by store_fingerprint, to bound memory on large memmaps
+FINGERPRINT_BLOCK_ROWS = 65536
+
+
+def store_fingerprint(feature_list, filenames):
+    """
+    Identifies one exact version of the store: its shape, dtype, matrix contents and
+    row-ordered filenames. Artifacts built from the store save it so they can refuse
+    to load once rows shift or images are re-embedded under the same names.
+    Reads the whole matrix once; callers compute it at load time, not per query.
+    """
+    digest = hashlib.sha256(f"{np.shape(feature_list)} {np.dtype(feature_list.dtype).str}\n".encode())
+    for start in range(0, len(feature_list), FINGERPRINT_BLOCK_ROWS):
+        digest.update(np.ascontiguousarray(feature_list[start:start + FINGERPRINT_BLOCK_ROWS]).data)
+    digest.update('\n'.join(normalize_filename(name) for name in filenames).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def store_exists(matrix_path, filenames_path):
+    return os.path.exists(matrix_path) and os.path.exists(filenames_path)
@@ -0,0 +1,108 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+import numpy as np
+
+from . import metrics
+
+
+class MicroBatcher:
+    """
+    Single worker thread that coalesces queued requests into batches.
+    A batch is dispatched once it reaches max_batch_size or the oldest
+    request has waited max_wait_ms, whichever comes first.
+    """
+
+    def __init__(self, name, run_batch, max_batch_size=8, max_wait_ms=10):
+        self.name = name
+        self.run_batch = run_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.requests = queue.Queue()
+        self.worker = threading.Thread(target=self._loop, name=f"{name}-batcher", daemon=True)
+        self.worker.start()
+
+    def submit(self, item):
+        future = Future()
+        self.requests.put((item, future, time.perf_counter()))
+        metrics.set_gauge(f"{self.name}.queue_depth", self.requests.qsize())
+        return future
+
+    def _collect(self):
+        batch = [self.requests.get()]
+        deadline = batch[0][2] + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                # Past the deadline, still take whatever is already queued
+                if remaining <= 0:
+                    batch.append(self.requests.get_nowait())
+                else:
+                    batch.append(self.requests.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _loop(self):
+        while True:
+            batch = self._collect()
+            started = time.perf_counter()
+            metrics.set_gauge(f"{self.name}.queue_depth", self.requests.qsize())
+            metrics.observe(f"{self.name}.batch_size", len(batch))
+            for _, _, queued_at in batch:
+                metrics.observe(f"{self.name}.queue_wait_ms", (started - queued_at) * 1000)
+            try:
+                self._dispatch(batch)
+            except Exception as e:
+                if len(batch) == 1:
+                    batch[0][1].set_exception(e)
+                else:
+                    # One bad request must not fail its neighbours: retry each on its own
+                    metrics.increment(f"{self.name}.batch_retries")
+                    for request in batch:
+                        try:
+                            self._dispatch([request])
+                        except Exception as item_error:
+                            request[1].set_exception(item_error)
+            metrics.observe(f"{self.name}.batch_ms", (time.perf_counter() - started) * 1000)
+
+    def _dispatch(self, batch):
+        """Run one batch and resolve its futures; raises without resolving any of them."""
+        results = list(self.run_batch([item for item, _, _ in batch]))
+        if len(results) != len(batch):
+            raise RuntimeError(f"{self.name} returned {len(results)} results for a batch of {len(batch)}")
+        for (_, future, _), result in zip(batch, results):
+            future.set_result(result)
+
+
+class InferenceService:
+    """
+    Shared in-process inference for every Streamlit session.
+    Detection requests are whatever the detector's predict() accepts (paths,
+    BGR arrays or DecodedImage objects); embedding requests are preprocessed
+    224x224x3 arrays. Both return futures.
+    """
+
+    def __init__(self, yolo_model, resnet_model, conf, iou=0.7, max_batch_size=8, max_wait_ms=10):
+        self.detector = MicroBatcher(
+            'detector',
+            lambda sources: yolo_model.predict(sources, conf=conf, iou=iou, verbose=False),
+            max_batch_size,
+            max_wait_ms
+        )
+        self.embedder = MicroBatcher(
+            'embedder',
+            lambda arrays: list(resnet_model.predict(np.stack(arrays), verbose=0)),
+            max_batch_size,
+            max_wait_ms
+        )
+
+    def detect(self, source):
+        return self.detector.submit(source)
+
+    def embed(self, preprocessed_img):
+        return self.embedder.submit(preprocessed_img)
+
+    def stats(self):
+        return metrics.snapshot()
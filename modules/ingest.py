@@ -0,0 +1,89 @@
+import functools
+import hashlib
+import io
+import cv2
+import numpy as np
+from PIL import Image, ImageOps
+
+# Longest side of the image handed to the palette extractor
+PALETTE_MAX_SIDE = 256
+
+
+def letterbox(img, size, color=114):
+    """
+    Resize keeping the aspect ratio and pad to a square input, as ultralytics does
+    Returns: (padded image, gain, (pad_x, pad_y))
+    """
+    height, width = img.shape[:2]
+    gain = min(size / height, size / width)
+    new_w, new_h = round(width * gain), round(height * gain)
+    pad_x, pad_y = (size - new_w) / 2, (size - new_h) / 2
+    if (new_w, new_h) != (width, height):
+        img = cv2.resize(img, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+    top, bottom = round(pad_y - 0.1), round(pad_y + 0.1)
+    left, right = round(pad_x - 0.1), round(pad_x + 0.1)
+    img = cv2.copyMakeBorder(img, top, bottom, left, right, cv2.BORDER_CONSTANT, value=(color, color, color))
+    return img, gain, (left, top)
+
+
+class DecodedImage:
+    """
+    An image decoded once, with EXIF orientation applied, shared by every analysis step.
+    The downsized model inputs are derived from the RGB pixels on first use and kept;
+    the full-resolution pil and bgr views are rebuilt on each access instead.
+    """
+
+    def __init__(self, rgb, path=None, content_hash=None):
+        self.rgb = rgb
+        self.path = path
+        self.content_hash = content_hash
+        self._letterboxed = {}
+
+    @classmethod
+    def from_bytes(cls, data, path=None):
+        img = ImageOps.exif_transpose(Image.open(io.BytesIO(data)))
+        rgb = np.asarray(img.convert('RGB'))
+        return cls(rgb, path=path, content_hash=hashlib.sha256(data).hexdigest())
+
+    @classmethod
+    def from_path(cls, path):
+        with open(path, 'rb') as f:
+            return cls.from_bytes(f.read(), path=path)
+
+    @property
+    def pil(self):
+        return Image.fromarray(self.rgb)
+
+    @property
+    def bgr(self):
+        """Channel order expected by OpenCV and ultralytics for array sources."""
+        return np.ascontiguousarray(self.rgb[..., ::-1])
+
+    @functools.cached_property
+    def resnet_input(self):
+        # Same nearest-neighbour resize keras load_img(target_size=...) performs
+        return np.asarray(self.pil.resize((224, 224), Image.NEAREST), dtype=np.float32)
+
+    def letterboxed(self, size):
+        """Padded square BGR input for the detector; see letterbox()."""
+        if size not in self._letterboxed:
+            self._letterboxed[size] = letterbox(self.bgr, size)
+        return self._letterboxed[size]
+
+    @functools.cached_property
+    def palette_image(self):
+        img = self.pil.copy()
+        img.thumbnail((PALETTE_MAX_SIDE, PALETTE_MAX_SIDE), Image.BILINEAR)
+        return img
+
+    @property
+    def palette_sample(self):
+        """Downsampled (n, 3) uint8 RGB pixels for palette extraction."""
+        return np.asarray(self.palette_image).reshape(-1, 3)
+
+
+def load_image(source):
+    """Accept a DecodedImage or a path and return a DecodedImage."""
+    if isinstance(source, DecodedImage):
+        return source
+    return DecodedImage.from_path(source)
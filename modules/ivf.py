@@ -0,0 +1,178 @@
+import numpy as np
+
+from .similarity import SimilarityIndex, top_k, cosine_to_euclidean, stack_query_results
+
+# Rows assigned to centroids per block while training, to bound memory
+ASSIGN_BLOCK_ROWS = 16384
+
+
+def _assign(feature_list, centroids):
+    """Nearest centroid (by cosine similarity) for every row."""
+    assignments = np.empty(len(feature_list), dtype=np.int32)
+    for start in range(0, len(feature_list), ASSIGN_BLOCK_ROWS):
+        block = np.asarray(feature_list[start:start + ASSIGN_BLOCK_ROWS], dtype=np.float32)
+        assignments[start:start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+    return assignments
+
+
+def _kmeans(samples, n_lists, n_iter, rng):
+    """Spherical k-means on L2-normalized samples."""
+    centroids = samples[rng.choice(len(samples), n_lists, replace=False)].copy()
+    for _ in range(n_iter):
+        assignments = np.argmax(samples @ centroids.T, axis=1)
+        # Sort rows by centroid and sum each contiguous run; np.add.at is unbuffered and slow
+        order = np.argsort(assignments, kind='stable')
+        counts = np.bincount(assignments, minlength=n_lists)
+        starts = np.cumsum(counts) - counts
+        empty = counts == 0
+        sums = np.zeros_like(centroids)
+        sums[~empty] = np.add.reduceat(samples[order], starts[~empty], axis=0)
+        if empty.any():
+            sums[empty] = samples[rng.choice(len(samples), int(empty.sum()), replace=False)]
+        centroids = sums / np.maximum(np.linalg.norm(sums, axis=1, keepdims=True), 1e-12)
+    return centroids.astype(np.float32)
+
+
+def train_ivf(feature_list, n_lists=None, n_iter=20, sample_size=100000, seed=0):
+    """
+    Train an inverted-file index offline from the embedding matrix.
+    Coarse centroids come from k-means on a sample; every row is then
+    filed into the posting list of its nearest centroid.
+    """
+    n_rows = len(feature_list)
+    if n_lists is None:
+        n_lists = max(1, int(4 * np.sqrt(n_rows)))
+    n_lists = min(n_lists, n_rows)
+    rng = np.random.default_rng(seed)
+
+    sample_ids = np.sort(rng.choice(n_rows, min(sample_size, n_rows), replace=False))
+    samples = np.asarray(feature_list[sample_ids], dtype=np.float32)
+    centroids = _kmeans(samples, n_lists, n_iter, rng)
+
+    assignments = _assign(feature_list, centroids)
+    list_ids = np.argsort(assignments, kind='stable').astype(np.int64)
+    list_offsets = np.zeros(n_lists + 1, dtype=np.int64)
+    np.cumsum(np.bincount(assignments, minlength=n_lists), out=list_offsets[1:])
+    return IVFIndex(feature_list, centroids, list_offsets, list_ids)
+
+
+class IVFIndex:
+    """
+    Approximate top-k search: only the posting lists of the `nprobe`
+    centroids nearest to the query are scanned.
+    """
+
+    def __init__(self, feature_list, centroids, list_offsets, list_ids, nprobe=8):
+        self.feature_list = feature_list
+        self.centroids = centroids
+        self.list_offsets = list_offsets
+        self.list_ids = list_ids
+        self.nprobe = nprobe
+
+    def __len__(self):
+        return len(self.feature_list)
+
+    @property
+    def n_lists(self):
+        return len(self.centroids)
+
+    def candidates(self, features, nprobe=None):
+        """Row ids stored in the posting lists closest to the query."""
+        nprobe = min(nprobe or self.nprobe, self.n_lists)
+        lists = top_k(self.centroids @ features, nprobe)
+        return np.concatenate([
+            self.list_ids[self.list_offsets[i]:self.list_offsets[i + 1]] for i in lists
+        ])
+
+    def query(self, features, k=5, nprobe=None, allowed=None):
+        """
+        Find approximately the k rooms closest to a normalized query vector.
+        `allowed` is an optional boolean row mask. When it keeps no more rows than
+        the probed lists would hold, those rows are scanned exactly; otherwise
+        nprobe is doubled until the probed lists contain k allowed rows.
+        Returns: (euclidean distances, row indices), nearest first
+        """
+        query = np.asarray(features, dtype=np.float32).ravel()
+        nprobe = min(nprobe or self.nprobe, self.n_lists)
+        if allowed is None:
+            ids = np.sort(self.candidates(query, nprobe))
+        else:
+            n_allowed = int(np.count_nonzero(allowed))
+            if n_allowed <= len(self) * nprobe / self.n_lists:
+                ids = np.flatnonzero(allowed)
+            else:
+                while True:
+                    ids = np.sort(self.candidates(query, nprobe))
+                    ids = ids[allowed[ids]]
+                    if len(ids) >= min(k, n_allowed) or nprobe >= self.n_lists:
+                        break
+                    nprobe = min(nprobe * 2, self.n_lists)
+        scores = np.asarray(self.feature_list[ids], dtype=np.float32) @ query
+        best = top_k(scores, k)
+        return cosine_to_euclidean(scores[best]), ids[best]
+
+    def query_batch(self, queries, k=5, **params):
+        """
+        Top-k for every row of an (n, d) query matrix, one query at a time since
+        each query probes different posting lists.
+        Returns: (distances, indices), each shaped (n, k), nearest first; see stack_query_results
+        """
+        queries = np.asarray(queries, dtype=np.float32).reshape(-1, self.feature_list.shape[1])
+        return stack_query_results([self.query(query, k, **params) for query in queries], min(k, len(self)))
+
+    def save(self, path, fingerprint):
+        """fingerprint is embedding_store.store_fingerprint() of the store the index was trained on."""
+        np.savez(
+            path,
+            centroids=self.centroids,
+            list_offsets=self.list_offsets,
+            list_ids=self.list_ids,
+            nprobe=np.int64(self.nprobe),
+            n_rows=np.int64(len(self.feature_list)),
+            fingerprint=np.str_(fingerprint),
+        )
+
+    @classmethod
+    def load(cls, path, feature_list, fingerprint):
+        data = np.load(path)
+        if int(data['n_rows']) != len(feature_list):
+            raise ValueError(f"{path} was trained on {int(data['n_rows'])} rows, store has {len(feature_list)}")
+        if 'fingerprint' not in data.files or str(data['fingerprint']) != fingerprint:
+            raise ValueError(f"{path} was trained on a different version of the embedding store")
+        return cls(feature_list, data['centroids'], data['list_offsets'], data['list_ids'], int(data['nprobe']))
+
+
+def calibrate_nprobe(index, target_recall=0.95, k=5, n_queries=200, seed=0):
+    """
+    Smallest nprobe whose mean recall@k against exact search reaches the target,
+    measured with corpus rows as queries.
+    Returns: (nprobe, recall)
+    """
+    rng = np.random.default_rng(seed)
+    query_ids = np.sort(rng.choice(len(index), min(n_queries, len(index)), replace=False))
+    queries = np.asarray(index.feature_list[query_ids], dtype=np.float32)
+    exact = SimilarityIndex(index.feature_list)
+    truths = [set(exact.query(query, k)[1].tolist()) for query in queries]
+    total = sum(len(truth) for truth in truths)
+
+    def recall_at(nprobe):
+        hits = sum(
+            len(truth & set(index.query(query, k, nprobe)[1].tolist()))
+            for query, truth in zip(queries, truths)
+        )
+        return hits / total
+
+    # Double until the target is met, then binary search the last interval
+    low, high = 0, 1
+    recall = recall_at(high)
+    while recall < target_recall and high < index.n_lists:
+        low, high = high, min(high * 2, index.n_lists)
+        recall = recall_at(high)
+    while high - low > 1:
+        mid = (low + high) // 2
+        mid_recall = recall_at(mid)
+        if mid_recall >= target_recall:
+            high, recall = mid, mid_recall
+        else:
+            low = mid
+    return high, recall
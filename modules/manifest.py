@@ -0,0 +1,66 @@
+import hashlib
+import json
+import os
+import time
+
+
+def file_sha256(path, block_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class BuildManifest:
+    """
+    Tracks which corpus files an offline job has already processed.
+    Entries are keyed by path and record content hash, mtime and size plus
+    wherever the job stored the result; deleted files are kept as tombstones.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                self.entries = json.load(f)
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f)
+        os.replace(tmp_path, self.path)
+
+    def plan(self, paths):
+        """
+        Compare files on disk with the manifest
+        Returns: (pending [(path, sha256, mtime, size)], deleted [path])
+        """
+        pending = []
+        for path in sorted(paths):
+            stat = os.stat(path)
+            entry = self.entries.get(path)
+            if entry and not entry.get('deleted') and entry['mtime'] == stat.st_mtime and entry['size'] == stat.st_size:
+                continue
+            sha = file_sha256(path)
+            if entry and not entry.get('deleted') and entry['sha256'] == sha:
+                # Touched but unchanged: refresh the stat fields, keep the result
+                entry['mtime'], entry['size'] = stat.st_mtime, stat.st_size
+                continue
+            pending.append((path, sha, stat.st_mtime, stat.st_size))
+
+        on_disk = set(paths)
+        deleted = [path for path, entry in self.entries.items() if path not in on_disk and not entry.get('deleted')]
+        return pending, deleted
+
+    def record(self, path, sha, mtime, size, **location):
+        self.entries[path] = {'sha256': sha, 'mtime': mtime, 'size': size, **location}
+
+    def tombstone(self, path):
+        self.entries[path] = {**self.entries[path], 'deleted': True, 'deleted_at': time.time()}
+
+    def live(self):
+        """Non-deleted entries in path order."""
+        return [(path, entry) for path, entry in sorted(self.entries.items()) if not entry.get('deleted')]
@@ -0,0 +1,41 @@
+import threading
+
+_lock = threading.Lock()
+_counters = {}
+_gauges = {}
+_histograms = {}
+
+
+def increment(name, value=1):
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + value
+
+
+def set_gauge(name, value):
+    with _lock:
+        _gauges[name] = value
+
+
+def observe(name, value):
+    """Record one observation; keeps count, sum, min and max."""
+    with _lock:
+        stats = _histograms.setdefault(name, {'count': 0, 'sum': 0.0, 'min': value, 'max': value})
+        stats['count'] += 1
+        stats['sum'] += value
+        stats['min'] = min(stats['min'], value)
+        stats['max'] = max(stats['max'], value)
+
+
+def get_counter(name):
+    with _lock:
+        return _counters.get(name, 0)
+
+
+def snapshot():
+    """Copy of every metric, with a mean added to each histogram."""
+    with _lock:
+        histograms = {
+            name: {**stats, 'mean': stats['sum'] / stats['count']}
+            for name, stats in _histograms.items()
+        }
+        return {'counters': dict(_counters), 'gauges': dict(_gauges), 'histograms': histograms}
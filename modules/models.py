@@ -1,26 +1,126 @@
 import streamlit as st
-import tensorflow as tf
-from tensorflow.keras.applications.resnet50 import ResNet50
-from tensorflow.keras.layers import GlobalMaxPooling2D
 from ultralytics import YOLO
 import pickle
 import numpy as np
-from modules.config import PATHS
+import os
+from modules.config import PATHS, SEARCH, EMBEDDING, DETECTION, INFERENCE, ANALYSIS_SCHEDULER
+from modules.similarity import SimilarityIndex
+from modules.ivf import IVFIndex
+from modules.compression import CompressedEmbeddings, CompressedIndex
+from modules.object_index import ObjectIndex
+from modules.thumbnails import build_thumbnail_map
+from modules.inference import InferenceService
+from modules.scheduler import AnalysisScheduler
+from modules.detections import detector_model_path
+from modules.onnx_backend import OnnxEmbeddingModel, embedding_model_path
+from modules.embedding_store import open_store, store_exists, store_fingerprint
 
 @st.cache_resource(show_spinner="🔍 Loading object detection model...")
 def load_yolo():
+    if DETECTION['backend'] == 'onnx':
+        from modules.onnx_detector import OnnxDetector
+        return OnnxDetector(
+            detector_model_path(),
+            imgsz=DETECTION['tiers'][DETECTION['tier']],
+            iou=DETECTION['iou'],
+            intra_op_threads=DETECTION['intra_op_threads']
+        )
     return YOLO(PATHS['yolo_model'])
 
-@st.cache_resource(show_spinner="🧠 Loading feature extraction model...")
-def load_resnet():
+def build_resnet():
+    # TensorFlow is only imported when the Keras backend is actually used
+    import tensorflow as tf
+    from tensorflow.keras.applications.resnet50 import ResNet50
+    from tensorflow.keras.layers import GlobalMaxPooling2D
     model = ResNet50(weights='imagenet', include_top=False, input_shape=(224,224,3))
     model.trainable = False
     return tf.keras.Sequential([model, GlobalMaxPooling2D()])
 
+@st.cache_resource(show_spinner="🧠 Loading feature extraction model...")
+def load_resnet():
+    model_path = embedding_model_path()
+    if model_path:
+        return OnnxEmbeddingModel(model_path, intra_op_threads=EMBEDDING['intra_op_threads'])
+    return build_resnet()
+
 @st.cache_resource(show_spinner="📂 Loading design database...")
 def load_features():
+    """Row-ordered (float embedding matrix, filenames) of the room corpus."""
+    if store_exists(PATHS['embedding_matrix'], PATHS['embedding_ids']):
+        return open_store(PATHS['embedding_matrix'], PATHS['embedding_ids'])
+    # Legacy pickles; run convert_embeddings.py once to switch to the memmap store
     with st.spinner("🔢 Processing image embeddings..."):
         feature_list = np.array(pickle.load(open(PATHS['embeddings'], 'rb')))
     with st.spinner("🏷️ Loading design catalog..."):
         filenames = pickle.load(open(PATHS['filenames'], 'rb'))
-    return feature_list, filenames
\ No newline at end of file
+    return feature_list, filenames
+
+def load_compressed(feature_list, fingerprint):
+    """PCA/int8 codes from compress_embeddings.py, or None when missing or built from another store."""
+    if not CompressedEmbeddings.exists(PATHS['pca_codes'], PATHS['pca_projection']):
+        st.warning("Compressed embeddings not found, using full vectors. Run compress_embeddings.py to create them.")
+        return None
+    try:
+        return CompressedEmbeddings.load(PATHS['pca_codes'], PATHS['pca_projection'], feature_list, fingerprint)
+    except ValueError as e:
+        st.warning(f"{e}, using full vectors. Re-run compress_embeddings.py.")
+        return None
+
+@st.cache_resource(show_spinner="🧭 Building similarity index...")
+def load_index(engine=None, compression=None):
+    feature_list, filenames = load_features()
+    engine = engine or SEARCH['engine']
+    compression = compression or SEARCH['compression']
+    if engine == 'exact' and compression is None:
+        return SimilarityIndex(feature_list)
+    fingerprint = store_fingerprint(feature_list, filenames)
+    if engine == 'ivf':
+        if os.path.exists(PATHS['ivf_index']):
+            try:
+                index = IVFIndex.load(PATHS['ivf_index'], feature_list, fingerprint)
+                if SEARCH['nprobe']:
+                    index.nprobe = SEARCH['nprobe']
+                return index
+            except ValueError as e:
+                st.warning(f"{e}, falling back to exact search. Re-run build_ivf_index.py.")
+        else:
+            st.warning("IVF index not found, falling back to exact search. Run build_ivf_index.py to create it.")
+    if compression == 'pca_int8':
+        embeddings = load_compressed(feature_list, fingerprint)
+        if embeddings is not None:
+            return CompressedIndex(embeddings, rerank=SEARCH['rerank'])
+    return SimilarityIndex(feature_list)
+
+@st.cache_resource(show_spinner="🏷️ Indexing detected objects...")
+def load_object_index():
+    _, filenames = load_features()
+    if os.path.exists(PATHS['objects_table']):
+        return ObjectIndex.from_table(PATHS['objects_table'], filenames)
+    return ObjectIndex.from_csv(PATHS['objects_csv'], filenames)
+
+@st.cache_resource(show_spinner=False)
+def load_thumbnails():
+    _, filenames = load_features()
+    return build_thumbnail_map(filenames)
+
+@st.cache_resource(show_spinner=False)
+def load_inference_service():
+    if not INFERENCE['enabled']:
+        return None
+    return InferenceService(
+        load_yolo(),
+        load_resnet(),
+        conf=DETECTION['conf'],
+        iou=DETECTION['iou'],
+        max_batch_size=INFERENCE['max_batch_size'],
+        max_wait_ms=INFERENCE['max_wait_ms']
+    )
+
+@st.cache_resource(show_spinner=False)
+def load_analysis_scheduler():
+    return AnalysisScheduler(
+        load_yolo(),
+        load_resnet(),
+        service=load_inference_service(),
+        max_workers=ANALYSIS_SCHEDULER['max_workers']
+    )
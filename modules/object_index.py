@@ -0,0 +1,95 @@
+import ast
+import os
+import numpy as np
+import pandas as pd
+
+from .embedding_store import normalize_filename
+
+
+class ObjectIndex:
+    """
+    Detected-object categories per corpus image, aligned with the embedding row order.
+    Each row is a uint64 bitmask with one bit per category; posting lists map
+    a category to the rows that contain it.
+    """
+
+    def __init__(self, categories, masks):
+        if len(categories) > 64:
+            raise ValueError(f"{len(categories)} categories do not fit in a 64-bit mask")
+        self.categories = list(categories)
+        self.bits = {category: np.uint64(1) << np.uint64(i) for i, category in enumerate(self.categories)}
+        self.masks = masks
+        self.postings = {category: np.flatnonzero(masks & bit) for category, bit in self.bits.items()}
+
+    @classmethod
+    def from_csv(cls, csv_path, filenames):
+        df = pd.read_csv(csv_path)
+        objects = dict(zip(df['image'], df['detected_objects'].apply(ast.literal_eval)))
+        categories = sorted(set().union(*objects.values()))
+        bits = {category: 1 << i for i, category in enumerate(categories)}
+        masks = np.zeros(len(filenames), dtype=np.uint64)
+        for row, filename in enumerate(filenames):
+            image = os.path.basename(normalize_filename(filename))
+            masks[row] = sum(bits[category] for category in objects.get(image, ()))
+        return cls(categories, masks)
+
+    @classmethod
+    def from_table(cls, table_path, filenames):
+        """Build from the columnar output of detect_corpus.py."""
+        table = load_object_table(table_path)
+        present = table['counts'] > 0
+        # Classes the model never found in the corpus are not offered as filters
+        columns = np.flatnonzero(present.any(axis=0))
+        categories = [str(table['classes'][c]) for c in columns]
+        row_of = {str(image): i for i, image in enumerate(table['image'])}
+        weights = np.uint64(1) << np.arange(len(columns), dtype=np.uint64)
+        table_masks = (present[:, columns].astype(np.uint64) * weights).sum(axis=1, dtype=np.uint64)
+        masks = np.zeros(len(filenames), dtype=np.uint64)
+        for row, filename in enumerate(filenames):
+            i = row_of.get(os.path.basename(normalize_filename(filename)))
+            if i is not None:
+                masks[row] = table_masks[i]
+        return cls(categories, masks)
+
+    def encode(self, categories):
+        mask = np.uint64(0)
+        for category in categories:
+            mask |= self.bits[category]
+        return mask
+
+    def decode(self, mask):
+        return {category for category, bit in self.bits.items() if mask & bit}
+
+    def objects_for(self, rows):
+        """Union of the categories found in the given rows."""
+        rows = np.asarray(rows, dtype=np.int64)
+        if len(rows) == 0:
+            return set()
+        return self.decode(np.bitwise_or.reduce(self.masks[rows]))
+
+    def rows_containing(self, categories):
+        """Boolean row mask of images that contain every given category."""
+        required = self.encode(categories)
+        return (self.masks & required) == required
+
+
+def save_object_table(path, images, classes, counts, max_confidence):
+    """
+    Write per-image detection results as typed columns:
+    image (str), classes (str), counts (n_images, n_classes) uint16 and
+    max_confidence (n_images, n_classes) float32, 0 where the class is absent.
+    """
+    tmp_path = path + '.tmp.npz'
+    np.savez(
+        tmp_path,
+        image=np.asarray(images, dtype=str),
+        classes=np.asarray(classes, dtype=str),
+        counts=np.asarray(counts, dtype=np.uint16).reshape(len(images), len(classes)),
+        max_confidence=np.asarray(max_confidence, dtype=np.float32).reshape(len(images), len(classes)),
+    )
+    os.replace(tmp_path, path)
+
+
+def load_object_table(path):
+    with np.load(path) as data:
+        return {name: data[name] for name in data.files}
@@ -0,0 +1,44 @@
+import numpy as np
+
+from .config import PATHS, EMBEDDING
+
+# ImageNet channel means used by keras resnet50.preprocess_input ('caffe' mode)
+CAFFE_MEANS = np.array([103.939, 116.779, 123.68], dtype=np.float32)
+
+
+def preprocess_input(batch):
+    """NumPy equivalent of keras resnet50.preprocess_input: RGB -> BGR, then subtract the means."""
+    return np.asarray(batch, dtype=np.float32)[..., ::-1] - CAFFE_MEANS
+
+
+def embedding_model_path():
+    """ONNX file used by the configured embedding backend; None for the Keras ImageNet weights."""
+    if EMBEDDING['backend'] == 'onnx_int8':
+        return PATHS['resnet_onnx_int8']
+    if EMBEDDING['backend'] == 'onnx':
+        return PATHS['resnet_onnx']
+    return None
+
+
+class OnnxEmbeddingModel:
+    """
+    ResNet50 + GlobalMaxPooling2D exported to ONNX, run through ONNX Runtime.
+    predict() mirrors the Keras call used in utils so the two are interchangeable.
+    """
+
+    def __init__(self, model_path, intra_op_threads=0):
+        # Imported here so preprocess_input stays usable without onnxruntime installed
+        import onnxruntime as ort
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = intra_op_threads
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(model_path, options, providers=['CPUExecutionProvider'])
+        self.input_name = self.session.get_inputs()[0].name
+
+    def predict(self, preprocessed_img, batch_size=32, verbose=0):
+        batch = np.asarray(preprocessed_img, dtype=np.float32)
+        outputs = [
+            self.session.run(None, {self.input_name: batch[start:start + batch_size]})[0]
+            for start in range(0, len(batch), batch_size)
+        ]
+        return np.concatenate(outputs)
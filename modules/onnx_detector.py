@@ -0,0 +1,86 @@
+import ast
+import cv2
+import numpy as np
+import onnxruntime as ort
+
+from .detections import results_from_arrays
+from .ingest import DecodedImage, letterbox
+
+
+def nms(boxes, scores, iou_threshold):
+    """Greedy non-maximum suppression; returns kept indices in descending score order."""
+    order = np.argsort(-scores)
+    areas = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+    keep = []
+    while len(order):
+        best, rest = order[0], order[1:]
+        keep.append(best)
+        x1 = np.maximum(boxes[best, 0], boxes[rest, 0])
+        y1 = np.maximum(boxes[best, 1], boxes[rest, 1])
+        x2 = np.minimum(boxes[best, 2], boxes[rest, 2])
+        y2 = np.minimum(boxes[best, 3], boxes[rest, 3])
+        inter = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+        iou = inter / (areas[best] + areas[rest] - inter + 1e-9)
+        order = rest[iou <= iou_threshold]
+    return np.array(keep, dtype=np.int64)
+
+
+class OnnxDetector:
+    """
+    YOLOv8 detector exported to ONNX, run through one reusable ONNX Runtime session.
+    predict() returns ultralytics Results objects so process_object_detection is unchanged.
+    """
+
+    def __init__(self, model_path, imgsz=640, iou=0.7, max_det=300, intra_op_threads=0):
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = intra_op_threads
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(model_path, options, providers=['CPUExecutionProvider'])
+        self.input_name = self.session.get_inputs()[0].name
+        metadata = self.session.get_modelmeta().custom_metadata_map
+        self.names = {int(k): v for k, v in ast.literal_eval(metadata['names']).items()}
+        self.imgsz = imgsz
+        self.iou = iou
+        self.max_det = max_det
+
+    def detect(self, img, conf, letterboxed=None, iou=None):
+        """
+        Run one BGR image through the session; letterboxed may carry a precomputed letterbox() result.
+        iou overrides the NMS threshold given to the constructor.
+        Returns: (xyxy boxes in original pixels, confidences, class ids)
+        """
+        padded, gain, (pad_x, pad_y) = letterboxed or letterbox(img, self.imgsz)
+        blob = np.ascontiguousarray(padded[..., ::-1].transpose(2, 0, 1), dtype=np.float32)[np.newaxis] / 255.0
+        output = self.session.run(None, {self.input_name: blob})[0][0].T  # (anchors, 4 + classes)
+
+        class_scores = output[:, 4:]
+        classes = np.argmax(class_scores, axis=1)
+        confidences = class_scores[np.arange(len(classes)), classes]
+        keep = confidences > conf
+        cx, cy, w, h = output[keep, :4].T
+        boxes = np.stack([cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2], axis=1)
+        confidences, classes = confidences[keep], classes[keep]
+
+        # Class-aware NMS by offsetting each class into its own coordinate range
+        offsets = classes[:, None] * 7680.0
+        kept = nms(boxes + offsets, confidences, self.iou if iou is None else iou)[:self.max_det]
+        boxes, confidences, classes = boxes[kept], confidences[kept], classes[kept]
+
+        boxes -= np.array([pad_x, pad_y, pad_x, pad_y], dtype=np.float32)
+        boxes /= gain
+        boxes[:, [0, 2]] = boxes[:, [0, 2]].clip(0, img.shape[1])
+        boxes[:, [1, 3]] = boxes[:, [1, 3]].clip(0, img.shape[0])
+        return boxes.astype(np.float32), confidences.astype(np.float32), classes.astype(np.int32)
+
+    def predict(self, source, conf=0.25, iou=None, verbose=False):
+        """Accepts an image path, a DecodedImage, or a list of either."""
+        sources = [source] if isinstance(source, (str, DecodedImage)) else list(source)
+        results = []
+        for item in sources:
+            if isinstance(item, DecodedImage):
+                img, letterboxed, path = item.bgr, item.letterboxed(self.imgsz), item.path
+            else:
+                img, letterboxed, path = cv2.imread(item), None, item
+            boxes, confidences, classes = self.detect(img, conf, letterboxed, iou)
+            results.append(results_from_arrays(path, self.names, boxes, confidences, classes, orig_img=img))
+        return results
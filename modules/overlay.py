@@ -0,0 +1,58 @@
+import io
+import numpy as np
+from PIL import ImageDraw, ImageFont
+
+# Longest side of the rendered overlay; the Home page shows it in a half-width column
+DISPLAY_MAX_SIDE = 960
+JPEG_QUALITY = 85
+
+# Same per-class colour cycle ultralytics uses for results.plot()
+BOX_COLORS = [
+    '#FF3838', '#FF9D97', '#FF701F', '#FFB21D', '#CFD231', '#48F90A', '#92CC17', '#3DDB86', '#1A9334', '#00D4BB',
+    '#2C99A8', '#00C2FF', '#344593', '#6473FF', '#0018EC', '#8438FF', '#520085', '#CB38FF', '#FF95C8', '#FF37C7',
+]
+
+
+def _display_canvas(img, max_side):
+    # img.pil builds a new image on every access, so it can be shrunk in place
+    canvas = img.pil
+    canvas.thumbnail((max_side, max_side))
+    return canvas
+
+
+def _encode_jpeg(canvas, quality):
+    buffer = io.BytesIO()
+    canvas.save(buffer, 'JPEG', quality=quality)
+    return buffer.getvalue()
+
+
+def render_preview(img, max_side=DISPLAY_MAX_SIDE, quality=JPEG_QUALITY):
+    """
+    The DecodedImage itself at display resolution
+    Returns: JPEG bytes ready for st.image
+    """
+    return _encode_jpeg(_display_canvas(img, max_side), quality)
+
+
+def render_overlay(img, boxes, confidences, classes, names, max_side=DISPLAY_MAX_SIDE, quality=JPEG_QUALITY):
+    """
+    Draw detection boxes and labels on a DecodedImage at display resolution
+    Returns: JPEG bytes ready for st.image
+    """
+    canvas = _display_canvas(img, max_side)
+    scale = canvas.width / img.rgb.shape[1]
+    draw = ImageDraw.Draw(canvas)
+    font = ImageFont.load_default()
+    line_width = max(2, round(sum(canvas.size) / 2 * 0.003))
+
+    for box, confidence, cls in zip(np.asarray(boxes) * scale, confidences, classes):
+        color = BOX_COLORS[int(cls) % len(BOX_COLORS)]
+        x1, y1, x2, y2 = box.tolist()
+        draw.rectangle((x1, y1, x2, y2), outline=color, width=line_width)
+        label = f"{names[int(cls)]} {confidence:.2f}"
+        left, top, right, bottom = draw.textbbox((0, 0), label, font=font)
+        label_y = y1 - (bottom - top) - 4 if y1 > (bottom - top) + 4 else y1
+        draw.rectangle((x1, label_y, x1 + right - left + 4, label_y + bottom - top + 4), fill=color)
+        draw.text((x1 + 2, label_y + 2 - top), label, fill='white', font=font)
+
+    return _encode_jpeg(canvas, quality)
@@ -0,0 +1,52 @@
+import numpy as np
+
+# ColorThief skips near-white pixels; keep the same rule so palettes are comparable
+WHITE_THRESHOLD = 250
+
+
+def sample_pixels(pixels, budget):
+    """
+    Evenly spaced subset of at most budget (n, 3) RGB pixels, without near-white ones.
+    An image that is entirely near-white keeps its pixels, so it still has a palette.
+    """
+    pixels = np.asarray(pixels, dtype=np.uint8).reshape(-1, 3)
+    coloured = pixels[~np.all(pixels > WHITE_THRESHOLD, axis=1)]
+    if len(coloured):
+        pixels = coloured
+    if len(pixels) > budget:
+        pixels = pixels[np.linspace(0, len(pixels) - 1, budget).astype(np.int64)]
+    return pixels
+
+
+def median_cut(pixels, n_colors):
+    """
+    Split the RGB cloud at the median of its widest channel, always splitting the
+    box with the largest population x range, until n_colors boxes remain
+    Returns: list of (r, g, b) box means, most populous first
+    """
+    boxes = [np.asarray(pixels, dtype=np.int16)]
+    while len(boxes) < n_colors:
+        ranges = [np.ptp(box, axis=0) if len(box) > 1 else np.zeros(3, dtype=np.int16) for box in boxes]
+        scores = [len(box) * int(r.max()) for box, r in zip(boxes, ranges)]
+        i = int(np.argmax(scores))
+        if scores[i] == 0:
+            break
+        box = boxes.pop(i)
+        channel = int(np.argmax(ranges[i]))
+        half = len(box) // 2
+        order = np.argpartition(box[:, channel], half)
+        boxes += [box[order[:half]], box[order[half:]]]
+    boxes.sort(key=len, reverse=True)
+    return [tuple(int(round(c)) for c in box.mean(axis=0)) for box in boxes if len(box)]
+
+
+def extract_palette(pixels, n_colors=4, budget=20000):
+    """
+    Dominant colours of an (n, 3) RGB pixel array as n_colors (r, g, b) tuples.
+    Images with fewer distinct colours repeat them, most populous first.
+    """
+    sample = sample_pixels(pixels, budget)
+    if len(sample) == 0:
+        return []
+    palette = median_cut(sample, n_colors)
+    return [palette[i % len(palette)] for i in range(n_colors)]
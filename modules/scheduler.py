@@ -0,0 +1,44 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from . import metrics
+from .utils import detect_objects, feature_extraction, get_dominant_colors
+
+
+class AnalysisScheduler:
+    """
+    Starts every per-upload analysis stage on a shared thread pool at once.
+    The model calls release the GIL, so an upload is ready after its slowest
+    stage rather than after the sum of all of them.
+    """
+
+    # Keys of the dict returned by submit()
+    STAGES = ('detections', 'palette', 'embedding')
+
+    def __init__(self, yolo_model, resnet_model, service=None, max_workers=6):
+        self.yolo_model = yolo_model
+        self.resnet_model = resnet_model
+        self.service = service
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='analysis')
+
+    def _timed(self, stage, fn, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            metrics.observe(f"analysis.{stage}_ms", (time.perf_counter() - started) * 1000)
+
+    def submit(self, img):
+        """
+        Queue detection, palette extraction and embedding for one DecodedImage
+        Returns: dict of stage name -> Future
+        """
+        return {
+            'detections': self.executor.submit(
+                self._timed, 'detections', detect_objects, img, self.yolo_model, service=self.service
+            ),
+            'palette': self.executor.submit(self._timed, 'palette', get_dominant_colors, img),
+            'embedding': self.executor.submit(
+                self._timed, 'embedding', feature_extraction, img, self.resnet_model, service=self.service
+            ),
+        }
@@ -0,0 +1,127 @@
+import numpy as np
+
+# Rows upcast to float32 at a time when the stored matrix is float16
+BLOCK_ROWS = 65536
+# Batch queries: score matrices are at most QUERY_TILE x BATCH_BLOCK_ROWS floats
+QUERY_TILE = 256
+BATCH_BLOCK_ROWS = 16384
+
+
+def top_k(scores, k):
+    """Indices of the k highest scores, best first, without a full sort."""
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    if k < len(scores):
+        candidates = np.argpartition(-scores, k - 1)[:k]
+    else:
+        candidates = np.arange(len(scores))
+    return candidates[np.argsort(-scores[candidates], kind='stable')]
+
+
+def top_k_rows(scores, k):
+    """Row-wise top_k for a 2-D score matrix: (rows, k) column indices, best first."""
+    k = min(k, scores.shape[1])
+    if k < scores.shape[1]:
+        candidates = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    else:
+        candidates = np.broadcast_to(np.arange(scores.shape[1]), scores.shape)
+    order = np.argsort(-np.take_along_axis(scores, candidates, axis=1), axis=1, kind='stable')
+    return np.take_along_axis(candidates, order, axis=1)
+
+
+def stack_query_results(results, k):
+    """
+    Stack per-query (distances, indices) into (n, k) arrays for query_batch.
+    Queries with fewer than k matches are padded with inf distances and -1 indices.
+    """
+    distances = np.full((len(results), k), np.inf, dtype=np.float32)
+    indices = np.full((len(results), k), -1, dtype=np.int64)
+    for row, (row_distances, row_indices) in enumerate(results):
+        distances[row, :len(row_distances)] = row_distances[:k]
+        indices[row, :len(row_indices)] = row_indices[:k]
+    return distances, indices
+
+
+def cosine_to_euclidean(similarities):
+    """Euclidean distance between unit vectors from their dot product."""
+    return np.sqrt(np.maximum(2.0 - 2.0 * similarities, 0.0))
+
+
+class SimilarityIndex:
+    """
+    Exact top-k search over L2-normalized room embeddings.
+    Built once per process; each query is one matrix-vector product.
+    """
+
+    def __init__(self, feature_list):
+        self.feature_list = feature_list
+
+    def __len__(self):
+        return len(self.feature_list)
+
+    def query(self, features, k=5, allowed=None):
+        """
+        Find the k rooms closest to a normalized query vector.
+        `allowed` is an optional boolean row mask applied before the scan.
+        Returns: (euclidean distances, row indices), nearest first
+        """
+        if allowed is None:
+            scores = self.scores(features)
+            indices = top_k(scores, k)
+            return cosine_to_euclidean(scores[indices]), indices
+        ids = np.flatnonzero(allowed)
+        scores = self.scores(features, ids)
+        best = top_k(scores, k)
+        return cosine_to_euclidean(scores[best]), ids[best]
+
+    def scores(self, features, ids=None):
+        """Cosine similarity of the query against every stored row, or only the given rows."""
+        query = np.asarray(features, dtype=np.float32).ravel()
+        if ids is None and self.feature_list.dtype == np.float32:
+            return self.feature_list @ query
+        n_rows = len(self.feature_list) if ids is None else len(ids)
+        scores = np.empty(n_rows, dtype=np.float32)
+        for start in range(0, n_rows, BLOCK_ROWS):
+            rows = slice(start, start + BLOCK_ROWS) if ids is None else ids[start:start + BLOCK_ROWS]
+            block = np.asarray(self.feature_list[rows], dtype=np.float32)
+            scores[start:start + len(block)] = block @ query
+        return scores
+
+    def query_batch(self, queries, k=5, allowed=None, tile=QUERY_TILE):
+        """
+        Top-k for every row of an (n, d) query matrix.
+        Queries are processed in tiles against blocks of stored rows, keeping a
+        running top-k per query so memory stays bounded by tile x block size.
+        `allowed` is an optional boolean row mask applied before the scan.
+        Returns: (distances, indices), each shaped (n, k), nearest first; rows with
+        fewer than k allowed matches are padded as in stack_query_results
+        """
+        queries = np.asarray(queries, dtype=np.float32)
+        queries = queries.reshape(len(queries), self.feature_list.shape[1])
+        ids = None if allowed is None else np.flatnonzero(allowed)
+        n_rows = len(self.feature_list) if ids is None else len(ids)
+        k = min(k, len(self.feature_list))
+        n_best = min(k, n_rows)
+        best_scores = np.full((len(queries), k), -np.inf, dtype=np.float32)
+        best_ids = np.full((len(queries), k), -1, dtype=np.int64)
+
+        for q_start in range(0, len(queries), tile):
+            tile_queries = queries[q_start:q_start + tile]
+            tile_scores = np.empty((len(tile_queries), 0), dtype=np.float32)
+            tile_ids = np.empty((len(tile_queries), 0), dtype=np.int64)
+            for start in range(0, n_rows, BATCH_BLOCK_ROWS):
+                if ids is None:
+                    rows = slice(start, start + BATCH_BLOCK_ROWS)
+                    row_ids = np.arange(start, min(start + BATCH_BLOCK_ROWS, n_rows))
+                else:
+                    rows = row_ids = ids[start:start + BATCH_BLOCK_ROWS]
+                block = np.asarray(self.feature_list[rows], dtype=np.float32)
+                scores = np.hstack([tile_scores, tile_queries @ block.T])
+                block_ids = np.hstack([tile_ids, np.broadcast_to(row_ids, (len(tile_queries), len(block)))])
+                keep = top_k_rows(scores, n_best)
+                tile_scores = np.take_along_axis(scores, keep, axis=1)
+                tile_ids = np.take_along_axis(block_ids, keep, axis=1)
+            best_scores[q_start:q_start + tile, :n_best] = tile_scores
+            best_ids[q_start:q_start + tile, :n_best] = tile_ids
+        return cosine_to_euclidean(best_scores), best_ids
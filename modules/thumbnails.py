@@ -0,0 +1,24 @@
+import os
+
+from .config import PATHS
+from .embedding_store import normalize_filename
+
+
+def thumbnail_path(filename):
+    """Location of the prebuilt JPEG thumbnail for a corpus image."""
+    name = os.path.splitext(os.path.basename(normalize_filename(filename)))[0]
+    return os.path.join(PATHS['thumbnails'], name + '.jpg')
+
+
+def build_thumbnail_map(filenames):
+    """
+    Map each corpus basename to the file the inspiration strip should serve:
+    the thumbnail when one was generated, the original image otherwise.
+    """
+    thumbnails = set(os.listdir(PATHS['thumbnails'])) if os.path.isdir(PATHS['thumbnails']) else set()
+    mapping = {}
+    for filename in filenames:
+        filename = normalize_filename(filename)
+        thumbnail = thumbnail_path(filename)
+        mapping[os.path.basename(filename)] = thumbnail if os.path.basename(thumbnail) in thumbnails else filename
+    return mapping
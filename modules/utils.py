@@ -1,18 +1,37 @@
 import os
 import numpy as np
-import pandas as pd
-import ast
 from PIL import Image
-from tensorflow.keras.preprocessing import image
-from tensorflow.keras.applications.resnet50 import preprocess_input
-from sklearn.neighbors import NearestNeighbors
 from numpy.linalg import norm
 
 from colorthief import ColorThief
 import webcolors
 import io
 
-from .config import PATHS
+from .config import EMBEDDING, DETECTION, PALETTE
+from .catalog import load_product_data
+from .analysis_cache import get_cache, model_version
+from .detections import results_to_arrays, results_from_arrays, detector_model_path
+from .ingest import load_image, PALETTE_MAX_SIDE
+from .onnx_backend import preprocess_input, embedding_model_path
+from .palette import extract_palette
+from . import metrics
+
+# Bump when the embedding model or palette algorithm changes so cached results are ignored
+EMBEDDING_VERSION = "resnet50-gmp-exif"
+if PALETTE['engine'] == 'numpy':
+    PALETTE_VERSION = f"mediancut-{PALETTE['sample_budget']}-exif-{PALETTE_MAX_SIDE}px-filled"
+else:
+    PALETTE_VERSION = f'colorthief-q1-exif-{PALETTE_MAX_SIDE}px'
+
+def embedding_version():
+    """Cache version for embeddings; changes with the backend and, for ONNX, the exported model file."""
+    model_path = embedding_model_path()
+    weights = model_version(model_path) if model_path else 'imagenet'
+    return f"{EMBEDDING_VERSION}-{EMBEDDING['backend']}-{weights}"
+
+def detection_version():
+    """Cache version for detections; changes with the weights file and the NMS settings."""
+    return f"{model_version(detector_model_path())}-conf{DETECTION['conf']}-iou{DETECTION['iou']}-exif"
 
 def save_uploaded_file(uploaded_file):
     try:
@@ -25,46 +44,140 @@ def save_uploaded_file(uploaded_file):
     except Exception as e:
         raise RuntimeError(f"File save error: {e}")
 
-def feature_extraction(img_path, model):
+def feature_extraction(img, model, service=None):
+    """img is a DecodedImage from modules.ingest or an image path."""
+    cache = get_cache()
+    try:
+        img = load_image(img)
+    except Exception as e:
+        raise RuntimeError(f"Feature extraction error: {e}")
+    if cache:
+        key = img.content_hash
+        version = embedding_version()
+        cached = cache.get(key, 'embedding', version)
+        if cached:
+            return cached[0]['embedding']
     try:
-        img = image.load_img(img_path, target_size=(224, 224))
-        img_array = image.img_to_array(img)
-        expanded_img_array = np.expand_dims(img_array, axis=0)
+        expanded_img_array = np.expand_dims(img.resnet_input, axis=0)
         preprocessed_img = preprocess_input(expanded_img_array)
-        result = model.predict(preprocessed_img, verbose=0).flatten()
-        return result / norm(result)
+        if service:
+            result = service.embed(preprocessed_img[0]).result()
+        else:
+            result = model.predict(preprocessed_img, verbose=0).flatten()
+        result = result / norm(result)
+    except Exception as e:
+        raise RuntimeError(f"Feature extraction error: {e}")
+    if cache:
+        cache.put(key, 'embedding', version, arrays={'embedding': result})
+    return result
+
+def _embed_inputs(model, chunk, results, cache, version):
+    """Embed one chunk of (position, content hash, resnet input) and store each result in place."""
+    try:
+        batch = np.stack([resnet_input for _, _, resnet_input in chunk])
+        embeddings = model.predict(preprocess_input(batch), batch_size=len(chunk), verbose=0)
+        embeddings = embeddings / norm(embeddings, axis=1, keepdims=True)
     except Exception as e:
         raise RuntimeError(f"Feature extraction error: {e}")
+    for (i, key, _), embedding in zip(chunk, embeddings):
+        results[i] = embedding
+        if cache:
+            cache.put(key, 'embedding', version, arrays={'embedding': embedding})
+
+def feature_extraction_batch(imgs, model, batch_size=32):
+    """
+    Embed DecodedImages or paths with one model.predict call per batch_size images.
+    Images are decoded one at a time and only their 224x224 input is kept until
+    its chunk is embedded, so memory does not grow with the number of inputs.
+    Returns: (n, d) array of normalized embeddings, in input order
+    """
+    cache = get_cache()
+    version = embedding_version() if cache else None
+    results = []
+    chunk = []
+    for i, source in enumerate(imgs):
+        results.append(None)
+        try:
+            img = load_image(source)
+        except Exception as e:
+            raise RuntimeError(f"Feature extraction error: {e}")
+        if cache:
+            cached = cache.get(img.content_hash, 'embedding', version)
+            if cached:
+                results[i] = cached[0]['embedding']
+                continue
+        chunk.append((i, img.content_hash, img.resnet_input))
+        if len(chunk) == batch_size:
+            _embed_inputs(model, chunk, results, cache, version)
+            chunk = []
+    if chunk:
+        _embed_inputs(model, chunk, results, cache, version)
+    return np.array(results)
+
+def recommend(features, index, k=5, allowed=None):
+    distances, indices = index.query(features, k=k, allowed=allowed)
+    return indices
 
-def recommend(features, feature_list):
-    neighbors = NearestNeighbors(n_neighbors=5, algorithm='brute', metric='euclidean')
-    neighbors.fit(feature_list)
-    distances, indices = neighbors.kneighbors([features])
-    return indices[0]
+def recommend_batch(features, index, k=5, allowed=None):
+    """Top-k row indices for each row of an (n, d) query matrix; short rows are padded with -1."""
+    distances, indices = index.query_batch(features, k=k, allowed=allowed)
+    return indices
 
-def detect_objects(image_path, model):
-    results = model.predict(image_path, conf=0.3)[0]
+def detector_source(img):
+    # The ONNX detector reuses the shared letterboxed view; ultralytics letterboxes a BGR array itself
+    return img if DETECTION['backend'] == 'onnx' else img.bgr
+
+def detect_objects(img, model, service=None):
+    """img is a DecodedImage from modules.ingest or an image path."""
+    img = load_image(img)
+    cache = get_cache()
+    if cache:
+        key = img.content_hash
+        version = detection_version()
+        cached = cache.get(key, 'detections', version)
+        if cached:
+            arrays, names = cached
+            return results_from_arrays(img.path, {int(k): v for k, v in names.items()}, orig_img=img.bgr, **arrays)
+    if service:
+        results = service.detect(detector_source(img)).result()
+    else:
+        results = model.predict(detector_source(img), conf=DETECTION['conf'], iou=DETECTION['iou'])[0]
+    if cache:
+        cache.put(key, 'detections', version, arrays=results_to_arrays(results), payload=results.names)
     return results
 
-def get_recommended_objects(detected_img):
+def get_recommended_objects(indices, object_index):
     try:
-        df = pd.read_csv(PATHS['objects_csv'])
-        df['detected_objects'] = df['detected_objects'].apply(ast.literal_eval)
-        options = df[df['image'].isin(detected_img)]['detected_objects'].values
-        return set().union(*options)
+        return object_index.objects_for(indices)
     except Exception as e:
         raise RuntimeError(f"Object recommendation error: {e}")
 
 
 
-def get_dominant_colors(image_path, num_colors=4):
+def get_dominant_colors(img, num_colors=4):
     """
-    Extract dominant colors from an image
+    Extract dominant colors from a DecodedImage (or an image path)
     Returns: List of hex color codes
     """
+    cache = get_cache()
+    version = f"{PALETTE_VERSION}-{num_colors}"
     try:
-        color_thief = ColorThief(image_path)
-        palette = color_thief.get_palette(color_count=num_colors, quality=1)
+        img = load_image(img)
+        if cache:
+            key = img.content_hash
+            cached = cache.get(key, 'palette', version)
+            if cached:
+                return cached[1]
+        # Counts real extractions only; compare with the "uploads" counter, which it should match
+        metrics.increment('palette.extractions')
+        if PALETTE['engine'] == 'numpy':
+            palette = extract_palette(img.palette_sample, num_colors, budget=PALETTE['sample_budget'])
+        else:
+            # Hand ColorThief the downsampled view instead of reopening the full-resolution file
+            buffer = io.BytesIO()
+            img.palette_image.save(buffer, 'PNG')
+            buffer.seek(0)
+            palette = ColorThief(buffer).get_palette(color_count=num_colors, quality=1)
         
         # Convert RGB to hex
         hex_colors = []
@@ -74,23 +187,13 @@ def get_dominant_colors(image_path, num_colors=4):
             except:
                 hex_colors.append(f"#{color[0]:02x}{color[1]:02x}{color[2]:02x}")
         
-        return hex_colors[:num_colors] 
-    
+        hex_colors = hex_colors[:num_colors]
+        if len(hex_colors) < num_colors:
+            raise ValueError(f"only {len(hex_colors)} of {num_colors} colors found")
     except Exception as e:
         print(f"Error extracting colors: {e}")
         return ["#FFFFFF", "#CCCCCC", "#999999", "#666666"] 
 
-
-def load_product_data(csv_path):
-    df = pd.read_csv(csv_path)
-    required = ['product_category', 'color']
-    if not all(col in df.columns for col in required):
-        missing = [col for col in required if col not in df.columns]
-        st.error(f"❌ Missing required columns: {', '.join(missing)}")
-        st.stop()
-    df.dropna(subset=['product_category', 'color'], inplace=True)
-    df['color'] = df['color'].astype(str).str.strip()
-    df['product_category'] = df['product_category'].astype(str).str.strip()
-    df = df[df['product_category'] != '']
-    df = df[df['color'] != '']
-    return df.drop_duplicates()
\ No newline at end of file
+    if cache:
+        cache.put(key, 'palette', version, payload=hex_colors)
+    return hex_colors
@@ -1,6 +1,5 @@
 import streamlit as st
-from modules.utils import load_product_data
-from modules.color_util import extract_category_colors
+from modules.catalog import load_catalog_metadata
 from modules.components import render_css_user_pref, render_title_user_pref
 
 def initialize_session_state():
@@ -138,7 +137,8 @@ def color_preferences_section(category_colors):
                 )
                 st.session_state.color_prefs[cat] = st.session_state[key]
 
-def generate_packages(category_colors, df):
+def generate_packages(catalog):
+    category_colors = catalog.category_colors
     if st.session_state.selected_items:
         with st.container():
             st.markdown("### 🚀 Generate Packages")
@@ -157,9 +157,8 @@ def generate_packages(category_colors, df):
                 missing_categories = []
 
                 for cat in selected_categories:
-                    cat_products = df[df['product_category'] == cat]
-                    if not cat_products.empty:
-                        min_price = cat_products['price'].min()
+                    min_price = catalog.min_price(cat)
+                    if min_price is not None:
                         min_required_budget += min_price
                     else:
                         missing_categories.append(cat)
@@ -261,14 +260,13 @@ def main():
     render_title_user_pref()
     initialize_session_state()
 
-    csv_path = "products.csv"
-    df = load_product_data(csv_path)
-    category_colors = extract_category_colors(df)
+    catalog = load_catalog_metadata("products.csv")
+    category_colors = catalog.category_colors
 
     budget_section()
     category_selection_section(category_colors)
     color_preferences_section(category_colors)
-    generate_packages(category_colors, df)
+    generate_packages(catalog)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
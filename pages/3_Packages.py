@@ -3,6 +3,7 @@ import pandas as pd
 import random
 import os
 from algorithm import genetic_algorithm
+from modules.catalog import catalog_version, load_catalog_metadata
 
 st.set_page_config(
     page_title="RoomScapes AI - Packages", 
@@ -258,17 +259,20 @@ st.markdown("""
 
 """, unsafe_allow_html=True)
 
-@st.cache_data
-def load_products(csv_path="products.csv"):
+@st.cache_data(max_entries=2)
+def load_products(csv_path, version):
     df = pd.read_csv(csv_path)
     required_cols = ['product_category', 'price', 'color', 'product_name', 'image_url', 'product_url', 'description']
     df['price'] = pd.to_numeric(df['price'], errors='coerce')
-    df.dropna(subset=['price'], inplace=True)
+    df.dropna(subset=['price', 'product_category'], inplace=True)
+    # Same category spelling as CatalogMetadata, whose price ranges filter these rows
+    df['product_category'] = df['product_category'].astype(str).str.strip()
     df['product_url'] = df['product_url'].fillna('#')
     df['description'] = df['description'].fillna('').astype(str)
     return df
 
-products_df = load_products()
+products_df = load_products("products.csv", catalog_version("products.csv"))
+catalog = load_catalog_metadata("products.csv")
 
 # Main title with animation
 st.markdown("""
@@ -422,13 +426,12 @@ else:
         st.stop()
     
     selected_categories = list(summary["categories"].keys())
-    all_categories = products_df['product_category'].unique().tolist()
+    all_categories = catalog.categories
     extra_categories = [cat for cat in all_categories if cat not in selected_categories]
     
-    # Calculate average prices and min/max
-    avg_prices = products_df.groupby('product_category')['price'].mean().to_dict()
-    min_max_df = products_df.groupby('product_category')['price'].agg(['min', 'max'])
-    min_max = {cat: (min_max_df.loc[cat]['min'], min_max_df.loc[cat]['max']) for cat in min_max_df.index}
+    # Average prices and min/max, precomputed once per catalog version
+    avg_prices = catalog.avg_prices()
+    min_max = catalog.min_max()
     
     # Set defaults for missing categories
     for cat in all_categories:
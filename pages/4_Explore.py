@@ -1,6 +1,7 @@
 import streamlit as st
 import pandas as pd
 import time
+from modules.catalog import catalog_version, read_catalog, load_catalog_metadata
 
 # --- Page Setup ---
 st.set_page_config(
@@ -10,11 +11,30 @@ st.set_page_config(
 
 # --- Load Data ---
 try:
-    df = pd.read_csv("products.csv")
+    df = read_catalog("products.csv", catalog_version("products.csv"))
 except FileNotFoundError:
     st.error("Error: products.csv not found. Please ensure it's in the correct directory.")
     st.stop()
 
+# --- Define column names ---
+cat_column = 'product_category'
+price_column = 'price'
+color_column = 'color'
+name_column = 'product_name'
+img_column = 'image_url'
+url_column = 'product_url'
+desc_column = 'description'
+
+# Check essential columns
+required_columns = [cat_column, price_column, name_column]
+missing_cols = [col for col in required_columns if col not in df.columns]
+if missing_cols:
+    st.error(f"Error: Missing required columns in products.csv: {', '.join(missing_cols)}")
+    st.stop()
+
+# Built only once the columns it reads are known to exist
+catalog = load_catalog_metadata("products.csv")
+
 # --- Page Title & Timestamp ---
 st.title("Product Catalog")
 current_datetime = time.strftime("%A, %B %d, %Y at %I:%M:%S %p %Z")
@@ -175,22 +195,6 @@ st.markdown("""
     </style>
 """, unsafe_allow_html=True)
 
-# --- Define column names ---
-cat_column = 'product_category'
-price_column = 'price'
-color_column = 'color'
-name_column = 'product_name'
-img_column = 'image_url'
-url_column = 'product_url'
-desc_column = 'description'
-
-# Check essential columns
-required_columns = [cat_column, price_column, name_column]
-missing_cols = [col for col in required_columns if col not in df.columns]
-if missing_cols:
-    st.error(f"Error: Missing required columns in products.csv: {', '.join(missing_cols)}")
-    st.stop()
-
 # --- Sidebar Filters ---
 st.sidebar.header("Filter Products")
 
@@ -210,18 +214,14 @@ else:
 
 # 2. Price Filter
 st.sidebar.markdown("---")
-if not category_filtered_df.empty:
-    valid_prices = category_filtered_df[price_column].dropna()
-    if not valid_prices.empty:
-        min_price = int(valid_prices.min())
-        max_price = int(valid_prices.max())
-        if min_price == max_price: max_price += 1
-        elif max_price < min_price: max_price = min_price + 1
-    else: min_price, max_price = 0, 1
-else:
-    min_price = 0
-    max_price = int(df[price_column].dropna().max()) if not df.empty and not df[price_column].dropna().empty else 1000
-    max_price = max(min_price + 1, max_price)
+# Slider bounds come from the cached per-category price stats instead of rescanning the frame
+price_scope = None if selected_category == "All Categories" else selected_category
+if not catalog.price_stats.empty and (price_scope is None or price_scope in catalog.price_stats.index):
+    min_price, max_price = (int(price) for price in catalog.price_range(price_scope))
+    if min_price == max_price: max_price += 1
+elif category_filtered_df.empty:
+    min_price, max_price = 0, 1000
+else: min_price, max_price = 0, 1
 
 price_range = st.sidebar.slider(
     f"Select Price Range (₹)",
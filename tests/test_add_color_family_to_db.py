@@ -0,0 +1,43 @@
+import sqlite3
+
+import pytest
+
+from add_color_family_to_db import MAPPING_TABLE, recategorize
+from modules.color_util import categorize_color_family
+
+HEX_COLORS = ['#000000', '#ffffff', '#ff0000', '#ff0000', '#00ff00', '#1e90ff', '#1E90FF', '#f5deb3', '#808080']
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = sqlite3.connect(tmp_path / 'products.db')
+    db.execute("CREATE TABLE products (id INTEGER PRIMARY KEY, color TEXT)")
+    colors = HEX_COLORS + ['#12345', 'Red', None]
+    db.executemany("INSERT INTO products (color) VALUES (?)", [(color,) for color in colors])
+    db.commit()
+    yield db
+    db.close()
+
+
+def product_colors(db):
+    return [color for color, in db.execute("SELECT color FROM products ORDER BY id")]
+
+
+def test_dry_run_reports_without_writing(db):
+    before = product_colors(db)
+    stats = recategorize(db, sqlite3.paramstyle, joined_update=False, dry_run=True)
+    assert stats == {'distinct': 9, 'products': 9, 'invalid': 1, 'changed': 0}
+    assert product_colors(db) == before
+    assert db.execute("SELECT name FROM sqlite_master WHERE name = ?", (MAPPING_TABLE,)).fetchone() is None
+
+
+def test_apply_rewrites_hex_colors_once(db):
+    stats = recategorize(db, sqlite3.paramstyle, joined_update=False)
+    assert stats == {'distinct': 9, 'products': 9, 'invalid': 1, 'changed': 9}
+    expected = [categorize_color_family(color) for color in HEX_COLORS] + ['#12345', 'Red', None]
+    assert product_colors(db) == expected
+
+    # Only the invalid code is still a hex value, so a rerun changes nothing
+    assert recategorize(db, sqlite3.paramstyle, joined_update=False) == \
+        {'distinct': 1, 'products': 0, 'invalid': 1, 'changed': 0}
+    assert product_colors(db) == expected
@@ -0,0 +1,67 @@
+import functools
+import http.server
+import io
+import sqlite3
+import threading
+
+import pytest
+from PIL import Image
+
+pytest.importorskip('colorthief')
+pytest.importorskip('requests')
+from modules.add_colors_to_db import backfill, make_session
+
+N_IMAGES = 12
+
+
+class QuietHandler(http.server.SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def image_server(tmp_path):
+    for i in range(N_IMAGES):
+        # Three colour stripes, so every image has a 3-colour palette
+        img = Image.new('RGB', (60, 30), (200, 20 * i, 40))
+        img.paste((20, 200, 10 * i), (20, 0, 40, 30))
+        img.paste((30, 40, 220), (40, 0, 60, 30))
+        buffer = io.BytesIO()
+        img.save(buffer, 'PNG')
+        (tmp_path / f"{i}.png").write_bytes(buffer.getvalue())
+    server = http.server.ThreadingHTTPServer(
+        ('127.0.0.1', 0), functools.partial(QuietHandler, directory=str(tmp_path))
+    )
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def db(tmp_path, image_server):
+    db = sqlite3.connect(tmp_path / 'products.db')
+    db.execute("CREATE TABLE products (id INTEGER PRIMARY KEY, image_url TEXT, color1 TEXT, color2 TEXT, color3 TEXT)")
+    rows = [(i + 1, f"{image_server}/{i}.png") for i in range(N_IMAGES)]
+    rows += [(N_IMAGES + 1, "ftp://example.com/room.png"), (N_IMAGES + 2, f"{image_server}/missing.png")]
+    db.executemany("INSERT INTO products (id, image_url) VALUES (?, ?)", rows)
+    db.commit()
+    yield db
+    db.close()
+
+
+def run_backfill(db):
+    return backfill(
+        db, sqlite3.paramstyle, fetch_workers=4, palette_workers=2, chunk_size=5, session=make_session(4, retries=0)
+    )
+
+
+def test_backfill_updates_checkpoints_and_resumes(db):
+    assert run_backfill(db) == {'updated': N_IMAGES, 'skipped': 1, 'failed': 1}
+    colors = db.execute("SELECT color1, color2, color3 FROM products WHERE id <= ?", (N_IMAGES,)).fetchall()
+    assert all(len(color) == 7 and color.startswith('#') for row in colors for color in row)
+    assert db.execute("SELECT COUNT(*) FROM products WHERE color1 IS NOT NULL").fetchone()[0] == N_IMAGES
+
+    # Only the skipped and failed products are left, and they stay unchanged
+    assert run_backfill(db) == {'updated': 0, 'skipped': 1, 'failed': 1}
+    assert db.execute("SELECT color1, color2, color3 FROM products WHERE id <= ?", (N_IMAGES,)).fetchall() == colors
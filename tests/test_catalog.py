@@ -0,0 +1,43 @@
+import pandas as pd
+import pytest
+
+pytest.importorskip('streamlit')
+from modules.catalog import CatalogMetadata
+
+
+def catalog_frame(**overrides):
+    columns = {
+        'product_category': ['Sofa', 'Sofa', 'Chair'],
+        'color': ['#ff0000', '#0000ff', '#00ff00'],
+        'price': ['100', '300', 'n/a'],
+    }
+    columns.update(overrides)
+    return pd.DataFrame({name: values for name, values in columns.items() if values is not None})
+
+
+def test_from_frame_price_stats():
+    catalog = CatalogMetadata.from_frame(catalog_frame(), version=(0, 0))
+    assert catalog.categories == ['Sofa']
+    assert catalog.price_range('Sofa') == (100, 300)
+    assert catalog.avg_prices() == {'Sofa': 200}
+    assert catalog.category_colors == {'Chair': ['#00ff00'], 'Sofa': ['#0000ff', '#ff0000']}
+
+
+def test_from_frame_uses_cleaned_categories_for_prices():
+    df = catalog_frame(
+        product_category=['Sofa', ' Sofa ', 'Chair', 'Lamp'],
+        color=['#ff0000', '#0000ff', '#00ff00', None],
+        price=['100', '300', '50', '20'],
+    )
+    catalog = CatalogMetadata.from_frame(df, version=(0, 0))
+    # The uncoloured Lamp is dropped by the cleaner, so it is not priced either
+    assert catalog.categories == ['Sofa', 'Chair']
+    assert sorted(catalog.category_colors) == ['Chair', 'Sofa']
+    assert catalog.min_price('Sofa') == 100
+    assert catalog.avg_prices() == {'Sofa': 200, 'Chair': 50}
+
+
+@pytest.mark.parametrize('column', ['price', 'color', 'product_category'])
+def test_from_frame_rejects_missing_columns(column):
+    with pytest.raises(ValueError, match=column):
+        CatalogMetadata.from_frame(catalog_frame(**{column: None}), version=(0, 0))
@@ -0,0 +1,44 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+pytest.importorskip('streamlit')
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CATALOG_PAGES = ['pages/2_Preferences.py', 'pages/3_Packages.py', 'pages/4_Explore.py']
+HEAVY_MODULES = ('tensorflow', 'keras', 'ultralytics', 'torch', 'cv2')
+
+# Runs in a fresh interpreter: any import of a heavy module raises, whether or not
+# it is installed, then the top-level imports of every catalog page are executed
+SCRIPT = '''
+import ast
+import importlib.abc
+import sys
+
+BLOCKED = {blocked!r}
+
+class BlockHeavyModules(importlib.abc.MetaPathFinder):
+    def find_spec(self, name, path=None, target=None):
+        if name.split('.')[0] in BLOCKED:
+            raise ImportError(f"catalog pages must not import {{name}}")
+        return None
+
+sys.meta_path.insert(0, BlockHeavyModules())
+
+for page in {pages!r}:
+    with open(page, encoding='utf-8') as f:
+        tree = ast.parse(f.read(), page)
+    imports = [node for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))]
+    exec(compile(ast.Module(body=imports, type_ignores=[]), page, 'exec'), {{}})
+
+loaded = [name for name in sys.modules if name.split('.')[0] in BLOCKED]
+assert not loaded, loaded
+'''
+
+
+def test_catalog_pages_do_not_load_ml_frameworks():
+    script = SCRIPT.format(blocked=HEAVY_MODULES, pages=CATALOG_PAGES)
+    result = subprocess.run([sys.executable, '-c', script], cwd=REPO_ROOT, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
@@ -0,0 +1,182 @@
+import colorsys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from modules import color_lut
+from modules.color_util import COLOR_FAMILIES, categorize_color_families, categorize_color_family, classify_rgb_codes
+
+MALFORMED = ['#fff', 'abc', ' 12345', '#12345', None, 'zzzzzz', '##00ff00', '+fffff', 3, '', '#GGGGGG']
+
+
+# Frozen copy of the colorsys if-chain that classify_rgb_codes replaced; the reference for these tests
+def old_hex_to_rgb(hex_code):
+    hex_code = hex_code.lstrip('#')
+    if len(hex_code) == 3:
+        hex_code = ''.join([c*2 for c in hex_code])
+    if len(hex_code) != 6:
+        raise ValueError(f"Invalid hex code: {hex_code}")
+    return tuple(int(hex_code[i:i+2], 16) for i in (0, 2, 4))
+
+
+def old_categorize_color_family(hex_code):
+    r, g, b = old_hex_to_rgb(hex_code)
+    h, l, s = colorsys.rgb_to_hls(r/255, g/255, b/255)
+    hue_deg = h * 360
+
+    # Threshold constants
+    VERY_LOW_SAT = 0.1   # Achromatic threshold
+    LOW_SAT = 0.25       # Desaturated/pastel threshold
+    MED_SAT = 0.5        # Medium saturation
+    VERY_HIGH_LIGHT = 0.9  # Near-white
+    HIGH_LIGHT = 0.75    # Light shades
+    LOW_LIGHT = 0.25     # Dark shades
+    VERY_LOW_LIGHT = 0.15  # Near-black
+
+    # Achromatic colors
+    if s < VERY_LOW_SAT:
+        if l < VERY_LOW_LIGHT: return "Black"
+        if l > VERY_HIGH_LIGHT: return "White"
+        return "Gray"
+
+    # Desaturated and pastel colors
+    if s < LOW_SAT:
+        if l > HIGH_LIGHT:
+            if 0 <= hue_deg < 15 or 345 <= hue_deg < 360: return "Light Pink"
+            if 15 <= hue_deg < 45: return "Peach"
+            if 45 <= hue_deg < 70: return "Cream"
+            if 70 <= hue_deg < 150: return "Mint"
+            if 150 <= hue_deg < 190: return "Pale Aqua"
+            if 190 <= hue_deg < 255: return "Sky Blue"
+            if 255 <= hue_deg < 285: return "Lavender"
+            if 285 <= hue_deg < 345: return "Dusty Pink"
+        elif LOW_LIGHT < l < HIGH_LIGHT:
+            if 15 <= hue_deg < 45: return "Beige"
+            if 45 <= hue_deg < 70: return "Taupe"
+            if 70 <= hue_deg < 100: return "Olive Drab"
+            if 190 <= hue_deg < 255: return "Slate"
+            if 255 <= hue_deg < 285: return "Mauve"
+
+    # Medium saturation colors
+    if s < MED_SAT:
+        if l > HIGH_LIGHT:
+            if 15 <= hue_deg < 45: return "Apricot"
+            if 70 <= hue_deg < 150: return "Celadon"
+            if 150 <= hue_deg < 190: return "Turquoise"
+        elif l < LOW_LIGHT:
+            if 70 <= hue_deg < 150: return "Dark Olive"
+            if 190 <= hue_deg < 255: return "Steel Blue"
+
+    # Chromatic colors with light/dark/vivid variants
+    if hue_deg < 15 or hue_deg >= 345:
+        if l < LOW_LIGHT: return "Maroon"
+        if l > HIGH_LIGHT: return "Blush"
+        return "Red" if s > MED_SAT else "Rose"
+    elif 15 <= hue_deg < 40:
+        if l < LOW_LIGHT: return "Rust"
+        if l > HIGH_LIGHT: return "Coral"
+        return "Orange" if s > MED_SAT else "Terracotta"
+    elif 40 <= hue_deg < 70:
+        if l < LOW_LIGHT: return "Bronze"
+        if l > HIGH_LIGHT and s > MED_SAT: return "Yellow"
+        if l > HIGH_LIGHT: return "Cream"
+        return "Gold" if s > 0.6 else "Khaki"
+    elif 70 <= hue_deg < 100:
+        if l < LOW_LIGHT: return "Dark Green"
+        if l > HIGH_LIGHT: return "Mint"
+        return "Olive" if s < 0.6 else "Lime"
+    elif 100 <= hue_deg < 150:
+        if l < LOW_LIGHT: return "Forest Green"
+        if l > HIGH_LIGHT: return "Celadon"
+        return "Green" if s > MED_SAT else "Sage"
+    elif 150 <= hue_deg < 190:
+        if l < LOW_LIGHT: return "Teal"
+        if l > HIGH_LIGHT: return "Aqua"
+        return "Cyan" if s > MED_SAT else "Turquoise"
+    elif 190 <= hue_deg < 240:
+        if l < LOW_LIGHT: return "Navy"
+        if l > HIGH_LIGHT: return "Sky Blue"
+        return "Blue" if s > MED_SAT else "Denim"
+    elif 240 <= hue_deg < 285:
+        if l < LOW_LIGHT: return "Indigo"
+        if l > HIGH_LIGHT: return "Lavender"
+        return "Purple" if s > MED_SAT else "Mauve"
+    elif 285 <= hue_deg < 345:
+        if l < LOW_LIGHT: return "Burgundy"
+        if l > HIGH_LIGHT: return "Pink"
+        return "Magenta" if s > MED_SAT else "Dusty Rose"
+
+    return "Other"  # Fallback (minimized with broader categories)
+
+
+def old_family_or_nan(hex_code):
+    try:
+        return old_categorize_color_family(hex_code)
+    except Exception:
+        return np.nan
+
+
+def as_list(families):
+    """Family names with None for NaN, so invalid codes compare equal."""
+    return [None if pd.isna(family) else family for family in families]
+
+
+def sample_rgb(n=50000, seed=0):
+    """Random colours plus every gray and the pure hue ramps, where the thresholds sit."""
+    rng = np.random.default_rng(seed)
+    ramp = np.arange(256, dtype=np.uint8)
+    zeros, full = np.zeros(256, dtype=np.uint8), np.full(256, 255, dtype=np.uint8)
+    edges = [np.stack(channels, axis=1) for channels in [
+        (ramp, ramp, ramp), (full, ramp, zeros), (ramp, full, zeros), (zeros, full, ramp),
+        (zeros, ramp, full), (ramp, zeros, full), (full, zeros, ramp),
+    ]]
+    return np.concatenate([rng.integers(0, 256, (n, 3), dtype=np.uint8)] + edges)
+
+
+def to_hex(rgb):
+    return ['#%02x%02x%02x' % tuple(row) for row in rgb.tolist()]
+
+
+@pytest.fixture
+def no_lut(monkeypatch):
+    monkeypatch.setattr(color_lut, 'load_lut', lambda: None)
+
+
+def test_classify_rgb_codes_matches_if_chain():
+    rgb = sample_rgb()
+    expected = [old_categorize_color_family(hex_code) for hex_code in to_hex(rgb)]
+    assert [COLOR_FAMILIES[code] for code in classify_rgb_codes(rgb)] == expected
+
+
+def test_hex_codes_match_if_chain(no_lut):
+    hex_codes = to_hex(sample_rgb(5000, seed=1)) + [c.upper() for c in to_hex(sample_rgb(100, seed=2))] + MALFORMED
+    expected = [old_family_or_nan(hex_code) for hex_code in hex_codes]
+    assert as_list(categorize_color_families(hex_codes)) == as_list(expected)
+
+
+def test_malformed_hex_codes(no_lut):
+    families = as_list(categorize_color_families(MALFORMED))
+    expected = as_list(old_family_or_nan(hex_code) for hex_code in MALFORMED)
+    assert dict(zip(map(repr, MALFORMED), families)) == dict(zip(map(repr, MALFORMED), expected))
+
+
+def test_lut_path_matches_if_chain(monkeypatch):
+    table = color_lut.build_lut()
+    monkeypatch.setattr(color_lut, 'load_lut', lambda: table)
+    rgb = sample_rgb(20000, seed=3)
+    expected = [old_categorize_color_family(hex_code) for hex_code in to_hex(rgb)]
+    assert list(categorize_color_families(rgb)) == expected
+    assert as_list(categorize_color_families(to_hex(rgb) + MALFORMED)) == \
+        expected + as_list(old_family_or_nan(hex_code) for hex_code in MALFORMED)
+
+
+@pytest.mark.parametrize('use_lut', [True, False])
+def test_scalar_matches_if_chain(monkeypatch, use_lut):
+    table = color_lut.build_lut() if use_lut else None
+    monkeypatch.setattr(color_lut, 'load_lut', lambda: table)
+    hex_codes = to_hex(sample_rgb(2000, seed=4)) + ['#FFF', 'a9978e']
+    assert [categorize_color_family(hex_code) for hex_code in hex_codes] == \
+        [old_categorize_color_family(hex_code) for hex_code in hex_codes]
+    with pytest.raises(ValueError):
+        categorize_color_family('#12345')
@@ -0,0 +1,40 @@
+import threading
+
+import pytest
+
+from modules.inference import MicroBatcher
+
+
+def submit_together(batcher, items):
+    """Queue every item before the worker wakes so they land in one batch."""
+    return [batcher.submit(item) for item in items]
+
+
+def test_failing_item_only_fails_itself():
+    def run_batch(items):
+        if 'bad' in items:
+            raise ValueError('bad item')
+        return [item.upper() for item in items]
+
+    batcher = MicroBatcher('test-isolation', run_batch, max_batch_size=4, max_wait_ms=200)
+    futures = submit_together(batcher, ['a', 'bad', 'c'])
+    assert futures[0].result(timeout=5) == 'A'
+    assert futures[2].result(timeout=5) == 'C'
+    with pytest.raises(ValueError):
+        futures[1].result(timeout=5)
+
+
+def test_short_result_list_resolves_every_future():
+    calls = []
+    lock = threading.Lock()
+
+    def run_batch(items):
+        with lock:
+            calls.append(len(items))
+        # Drops the last result whenever more than one item is batched
+        return items[:-1] if len(items) > 1 else items
+
+    batcher = MicroBatcher('test-short', run_batch, max_batch_size=4, max_wait_ms=200)
+    futures = submit_together(batcher, [1, 2, 3])
+    assert [future.result(timeout=5) for future in futures] == [1, 2, 3]
+    assert calls[0] == 3
@@ -0,0 +1,23 @@
+import numpy as np
+
+from modules.palette import extract_palette
+
+
+def test_white_image_still_has_a_palette():
+    pixels = np.full((64 * 64, 3), 255, dtype=np.uint8)
+    pixels[::5] = 252
+    palette = extract_palette(pixels, 4)
+    assert len(palette) == 4
+    assert all(min(color) > 250 for color in palette)
+
+
+def test_single_colour_image_fills_every_slot():
+    pixels = np.tile(np.array([[30, 120, 200]], dtype=np.uint8), (500, 1))
+    assert extract_palette(pixels, 4) == [(30, 120, 200)] * 4
+
+
+def test_mixed_image_returns_distinct_colours():
+    rng = np.random.default_rng(0)
+    pixels = rng.integers(0, 256, (5000, 3), dtype=np.uint8)
+    palette = extract_palette(pixels, 4)
+    assert len(palette) == len(set(palette)) == 4
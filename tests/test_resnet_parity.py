@@ -0,0 +1,38 @@
+import os
+
+import numpy as np
+import pytest
+
+from modules.config import PATHS
+from modules.onnx_backend import preprocess_input
+
+
+def sample_pixels(n=4, seed=0):
+    return np.random.default_rng(seed).integers(0, 256, (n, 224, 224, 3)).astype(np.float32)
+
+
+def normalize(vectors):
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def test_preprocess_input_matches_keras():
+    resnet50 = pytest.importorskip('tensorflow.keras.applications.resnet50')
+    pixels = sample_pixels()
+    np.testing.assert_allclose(preprocess_input(pixels), resnet50.preprocess_input(pixels.copy()), atol=1e-4)
+
+
+@pytest.mark.parametrize('path_key, min_cosine', [('resnet_onnx', 0.999), ('resnet_onnx_int8', 0.97)])
+def test_onnx_embeddings_match_keras(path_key, min_cosine):
+    pytest.importorskip('tensorflow')
+    pytest.importorskip('onnxruntime')
+    pytest.importorskip('streamlit')
+    pytest.importorskip('ultralytics')
+    if not os.path.exists(PATHS[path_key]):
+        pytest.skip(f"{PATHS[path_key]} not exported; run export_resnet_onnx.py")
+    from modules.models import build_resnet
+    from modules.onnx_backend import OnnxEmbeddingModel
+
+    batch = preprocess_input(sample_pixels())
+    reference = normalize(build_resnet().predict(batch, verbose=0))
+    embeddings = normalize(OnnxEmbeddingModel(PATHS[path_key]).predict(batch))
+    assert np.sum(embeddings * reference, axis=1).min() >= min_cosine
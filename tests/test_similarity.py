@@ -0,0 +1,95 @@
+import numpy as np
+import pytest
+
+from modules.compression import CompressedEmbeddings, CompressedIndex, compress, fit_pca
+from modules.ivf import _kmeans, train_ivf
+from modules.similarity import SimilarityIndex
+
+N_ROWS, DIMS = 600, 16
+
+
+@pytest.fixture(scope='module')
+def corpus():
+    rng = np.random.default_rng(0)
+    feature_list = rng.standard_normal((N_ROWS, DIMS)).astype(np.float32)
+    return feature_list / np.linalg.norm(feature_list, axis=1, keepdims=True)
+
+
+def build_exact(feature_list):
+    return SimilarityIndex(feature_list)
+
+
+def build_ivf(feature_list):
+    index = train_ivf(feature_list, n_lists=20)
+    index.nprobe = 1
+    return index
+
+
+def build_compressed(feature_list):
+    mean, components = fit_pca(feature_list, n_components=8)
+    codes, scales = compress(feature_list, mean, components)
+    return CompressedIndex(CompressedEmbeddings(codes, scales, mean, components, feature_list), rerank=20)
+
+
+@pytest.fixture(params=[build_exact, build_ivf, build_compressed], ids=['exact', 'ivf', 'compressed'])
+def index(request, corpus):
+    return request.param(corpus)
+
+
+def assert_rows_match_query(index, queries, k, allowed=None):
+    distances, indices = index.query_batch(queries, k=k, allowed=allowed)
+    assert distances.shape == indices.shape == (len(queries), k)
+    for query, row_distances, row_indices in zip(queries, distances, indices):
+        expected_distances, expected_indices = index.query(query, k=k, allowed=allowed)
+        n = len(expected_indices)
+        np.testing.assert_array_equal(row_indices[:n], expected_indices)
+        # sqrt(2 - 2 cos) amplifies float32 rounding near a distance of 0
+        np.testing.assert_allclose(row_distances[:n], expected_distances, atol=1e-3)
+        # Rows with fewer matches are padded rather than truncating every other row
+        assert (row_indices[n:] == -1).all() and np.isinf(row_distances[n:]).all()
+
+
+def test_query_batch_matches_query(index, corpus):
+    assert_rows_match_query(index, corpus[:25], k=5)
+
+
+def test_query_batch_with_allowed_mask(index, corpus):
+    allowed = np.zeros(N_ROWS, dtype=bool)
+    allowed[::7] = True
+    assert_rows_match_query(index, corpus[:25], k=5, allowed=allowed)
+
+
+def test_query_batch_pads_rows_with_few_allowed(index, corpus):
+    allowed = np.zeros(N_ROWS, dtype=bool)
+    allowed[[3, 11]] = True
+    distances, indices = index.query_batch(corpus[:4], k=5, allowed=allowed)
+    assert indices.shape == (4, 5)
+    assert all(set(row[:2]) == {3, 11} for row in indices.tolist())
+    assert (indices[:, 2:] == -1).all() and np.isinf(distances[:, 2:]).all()
+
+
+def test_empty_query_batch(index):
+    distances, indices = index.query_batch(np.empty((0, DIMS), dtype=np.float32), k=5)
+    assert distances.shape == indices.shape == (0, 5)
+
+
+def reference_kmeans(samples, n_lists, n_iter, rng):
+    """The np.add.at update _kmeans replaced."""
+    centroids = samples[rng.choice(len(samples), n_lists, replace=False)].copy()
+    for _ in range(n_iter):
+        assignments = np.argmax(samples @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignments, samples)
+        empty = np.bincount(assignments, minlength=n_lists) == 0
+        if empty.any():
+            sums[empty] = samples[rng.choice(len(samples), int(empty.sum()), replace=False)]
+        centroids = sums / np.maximum(np.linalg.norm(sums, axis=1, keepdims=True), 1e-12)
+    return centroids.astype(np.float32)
+
+
+@pytest.mark.parametrize('n_lists', [20, 300])
+def test_kmeans_matches_add_at(corpus, n_lists):
+    # 300 lists over 600 rows leaves some lists empty, exercising the reseeding
+    centroids = _kmeans(corpus, n_lists, 10, np.random.default_rng(1))
+    expected = reference_kmeans(corpus, n_lists, 10, np.random.default_rng(1))
+    np.testing.assert_allclose(centroids, expected, atol=1e-5)
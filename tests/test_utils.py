@@ -0,0 +1,39 @@
+import io
+
+import numpy as np
+import pytest
+from PIL import Image
+
+pytest.importorskip('colorthief')
+pytest.importorskip('webcolors')
+pytest.importorskip('streamlit')
+from modules import metrics, utils
+from modules.analysis_cache import AnalysisCache
+from modules.ingest import DecodedImage
+
+
+def upload_bytes(seed):
+    rgb = np.random.default_rng(seed).integers(0, 256, (120, 160, 3), dtype=np.uint8)
+    buffer = io.BytesIO()
+    Image.fromarray(rgb).save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = AnalysisCache(str(tmp_path / 'cache'), 10 * 1024 * 1024)
+    monkeypatch.setattr(utils, 'get_cache', lambda: cache)
+    return cache
+
+
+def test_palette_extracted_once_per_upload(cache):
+    before = metrics.get_counter('palette.extractions')
+    data = upload_bytes(0)
+    # Every Streamlit rerun decodes the same upload again; only the first one extracts
+    palettes = [utils.get_dominant_colors(DecodedImage.from_bytes(data)) for _ in range(3)]
+    assert metrics.get_counter('palette.extractions') - before == 1
+    assert palettes[0] == palettes[1] == palettes[2]
+    assert len(palettes[0]) == 4
+
+    utils.get_dominant_colors(DecodedImage.from_bytes(upload_bytes(1)))
+    assert metrics.get_counter('palette.extractions') - before == 2